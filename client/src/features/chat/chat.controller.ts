@@ -2,7 +2,7 @@
 
 import type { ApiUserHeaders } from "@/lib/api";
 import { api } from "@/lib/api";
-import type { ChatRequest, ChatResponse } from "@/types";
+import type { ChatMessage as ApiChatMessage, ChatRequest, ChatResponse } from "@/types";
 import { usePathname, useRouter, useSearchParams } from "next/navigation";
 import * as React from "react";
 import { useAsyncFn, useNetworkState, useTitle } from "react-use";
@@ -16,6 +16,15 @@ export type ChatMessage = {
   agent: ChatAgent | "System";
 };
 
+function toChatMessage(m: ApiChatMessage): ChatMessage {
+  return {
+    id: String(m.id),
+    role: m.role === "system" ? "assistant" : m.role,
+    content: m.content,
+    agent: "System",
+  };
+}
+
 type UseChatControllerArgs = {
   user: ApiUserHeaders;
   onThreadCreated?: () => void;
@@ -29,6 +38,8 @@ type ChatControllerState = {
   threadId?: string;
   online: boolean;
   canSend: boolean;
+  hasOlder: boolean;
+  loadingOlder: boolean;
 };
 
 type ChatControllerActions = {
@@ -37,6 +48,7 @@ type ChatControllerActions = {
   onSend: () => Promise<void>;
   onResetThread: () => void;
   onUpdateMessage: (id: string, content: string) => Promise<void>;
+  onLoadOlder: () => Promise<void>;
 };
 
 type ChatControllerRefs = {
@@ -65,28 +77,28 @@ export function useChatController({
   const [threadId, setThreadId] = React.useState<string | undefined>(
     queryThreadId,
   );
+  // Cursor for the next older page of the open thread; undefined when its first message is already shown.
+  const [olderCursor, setOlderCursor] = React.useState<number | undefined>();
+  const threadRef = React.useRef(threadId);
+
+  React.useEffect(() => {
+    threadRef.current = threadId;
+  }, [threadId]);
 
   React.useEffect(() => {
     setThreadId(queryThreadId);
     if (!queryThreadId) {
       setMessages([]);
+      setOlderCursor(undefined);
     }
   }, [queryThreadId]);
 
   const [, loadThread] = useAsyncFn(
     async (tid: string) => {
       try {
-        const msgs = await api.chat.getThreadMessages(tid, user);
-        const mapped: ChatMessage[] = msgs.map((m) => ({
-          id: String(m.id),
-          role:
-            m.role === "system"
-              ? "assistant"
-              : (m.role as "user" | "assistant"),
-          content: m.content,
-          agent: "System",
-        }));
-        setMessages(mapped);
+        const page = await api.chat.getThreadMessages(tid, user);
+        setMessages(page.messages.map(toChatMessage));
+        setOlderCursor(page.nextCursor);
       } catch (e) {
         console.error("Failed to load thread", e);
       }
@@ -94,6 +106,27 @@ export function useChatController({
     [user],
   );
 
+  const [{ loading: loadingOlder }, loadOlder] = useAsyncFn(async () => {
+    const tid = threadId;
+    if (!tid || olderCursor === undefined) return;
+    try {
+      const page = await api.chat.getThreadMessages(tid, user, undefined, {
+        before: olderCursor,
+      });
+      // The user may have switched threads while this page was loading.
+      if (threadRef.current !== tid) return;
+      setMessages((prev) => [...page.messages.map(toChatMessage), ...prev]);
+      setOlderCursor(page.nextCursor);
+    } catch (e) {
+      console.error("Failed to load older messages", e);
+    }
+  }, [olderCursor, threadId, user]);
+
+  const onLoadOlder = React.useCallback(async () => {
+    if (loadingOlder) return;
+    await loadOlder();
+  }, [loadOlder, loadingOlder]);
+
   React.useEffect(() => {
     if (threadId) {
       loadThread(threadId);
@@ -104,9 +137,11 @@ export function useChatController({
     endRef.current?.scrollIntoView({ block: "end", behavior: "smooth" });
   }, []);
 
+  // Follow new messages at the end, but stay put when older pages are prepended.
+  const lastMessageId = messages.at(-1)?.id;
   React.useEffect(() => {
     scrollToEnd();
-  }, [messages.length, scrollToEnd]);
+  }, [lastMessageId, scrollToEnd]);
 
   const [{ loading }, send] = useAsyncFn(async () => {
     const text = input.trim();
@@ -174,6 +209,7 @@ export function useChatController({
 
   const onResetThread = React.useCallback(() => {
     setMessages([]);
+    setOlderCursor(undefined);
     setThreadId(undefined);
     setInput("");
     router.push(pathname);
@@ -216,6 +252,8 @@ export function useChatController({
     threadId,
     online,
     canSend,
+    hasOlder: olderCursor !== undefined,
+    loadingOlder,
   };
 
   const actions: ChatControllerActions = {
@@ -224,6 +262,7 @@ export function useChatController({
     onSend,
     onResetThread,
     onUpdateMessage,
+    onLoadOlder,
   };
 
   const refs: ChatControllerRefs = { endRef };
@@ -65,6 +65,9 @@ function ChatPageContent() {
               endRef={ctrl.refs.endRef}
               user={user}
               onUpdateMessage={ctrl.actions.onUpdateMessage}
+              hasOlder={ctrl.state.hasOlder}
+              loadingOlder={ctrl.state.loadingOlder}
+              onLoadOlder={ctrl.actions.onLoadOlder}
             />
           )}
         </ScrollArea>
@@ -1,7 +1,7 @@
 "use client";
 
 import * as React from "react";
-import { Bot, FileText, Film, User as UserIcon, Copy, Pencil, Check, X } from "lucide-react";
+import { Bot, FileText, Film, User as UserIcon, Copy, Pencil, Check, X, Loader2 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { Button } from "@/components/ui/button";
@@ -16,6 +16,9 @@ export type MessageListProps = {
   readonly endRef: React.RefObject<HTMLDivElement | null>;
   readonly user: User;
   readonly onUpdateMessage: (id: string, content: string) => Promise<void>;
+  readonly hasOlder: boolean;
+  readonly loadingOlder: boolean;
+  readonly onLoadOlder: () => Promise<void>;
 };
 
 function AgentIcon({ agent }: { readonly agent: ChatMessage["agent"] }) {
@@ -26,6 +29,46 @@ function AgentIcon({ agent }: { readonly agent: ChatMessage["agent"] }) {
   return <Bot className="h-3 w-3" aria-hidden="true" />;
 }
 
+// Loads the next older page when scrolled into view; the button covers browsers without IntersectionObserver.
+function OlderMessages({
+  loading,
+  onLoad,
+}: {
+  readonly loading: boolean;
+  readonly onLoad: () => Promise<void>;
+}) {
+  const ref = React.useRef<HTMLDivElement | null>(null);
+  const [visible, setVisible] = React.useState(false);
+
+  React.useEffect(() => {
+    const el = ref.current;
+    if (!el || typeof IntersectionObserver === "undefined") return;
+    const observer = new IntersectionObserver(
+      ([entry]) => setVisible(entry.isIntersecting),
+      { rootMargin: "200px 0px 0px 0px" },
+    );
+    observer.observe(el);
+    return () => observer.disconnect();
+  }, []);
+
+  React.useEffect(() => {
+    if (visible && !loading) void onLoad();
+  }, [visible, loading, onLoad]);
+
+  return (
+    // Excluded from scroll anchoring so the view stays on the message the user was reading as pages are prepended.
+    <div ref={ref} className="flex justify-center [overflow-anchor:none]">
+      {loading ? (
+        <Loader2 className="h-4 w-4 animate-spin text-muted-foreground" aria-label="Loading earlier messages" />
+      ) : (
+        <Button size="sm" variant="ghost" onClick={() => void onLoad()}>
+          Load earlier messages
+        </Button>
+      )}
+    </div>
+  );
+}
+
 const EditMessageForm = React.memo(function EditMessageForm({
   initialContent,
   onSave,
@@ -163,7 +206,16 @@ const MessageItem = React.memo(function MessageItem({
   );
 });
 
-export const MessageList = React.memo(function MessageList({ messages, loading, endRef, user, onUpdateMessage }: MessageListProps) {
+export const MessageList = React.memo(function MessageList({
+  messages,
+  loading,
+  endRef,
+  user,
+  onUpdateMessage,
+  hasOlder,
+  loadingOlder,
+  onLoadOlder,
+}: MessageListProps) {
   return (
     <div
       className="space-y-6 pb-4"
@@ -171,6 +223,8 @@ export const MessageList = React.memo(function MessageList({ messages, loading,
       aria-live="polite"
       aria-relevant="additions text"
     >
+      {hasOlder && <OlderMessages loading={loadingOlder} onLoad={onLoadOlder} />}
+
       {messages.map((msg) => (
         <MessageItem key={msg.id} msg={msg} user={user} onUpdate={onUpdateMessage} />
       ))}
@@ -3,8 +3,10 @@ import type {
   ChatResponse,
   ChatThread,
   ChatMessage,
+  ChatMessagePage,
   Document,
   DocumentCreate,
+  DocumentPermissions,
   Movie,
   User,
   UserCreate,
@@ -60,10 +62,10 @@ function buildHeaders(user?: ApiUserHeaders, extra?: Record<string, string>) {
   return { ...h, ...(extra || {}) };
 }
 
-async function fetchAPI<T>(
+async function fetchWithHeaders<T>(
   endpoint: string,
   options: FetchOptions = {}
-): Promise<T> {
+): Promise<{ data: T; headers: Headers }> {
   const res = await fetch(`${API_BASE_URL}${endpoint}`, {
     ...options,
     headers: buildHeaders(options.user, options.headers),
@@ -80,13 +82,32 @@ async function fetchAPI<T>(
     throw new ApiError(res.status, msg, payload);
   }
 
-  return (await parseJsonSafe(res)) as T;
+  return { data: (await parseJsonSafe(res)) as T, headers: res.headers };
+}
+
+async function fetchAPI<T>(
+  endpoint: string,
+  options: FetchOptions = {}
+): Promise<T> {
+  return (await fetchWithHeaders<T>(endpoint, options)).data;
 }
 
+// Largest page the users endpoint serves.
+const USERS_PAGE_SIZE = 500;
+
 export const api = {
   users: {
-    list: (user: ApiUserHeaders, signal?: AbortSignal) =>
-      fetchAPI<User[]>("/users/", { user, signal }),
+    list: async (user: ApiUserHeaders, signal?: AbortSignal) => {
+      // Pages through the whole list; the server reports its size in X-Total-Count.
+      const users: User[] = [];
+      for (;;) {
+        const params = new URLSearchParams({ offset: String(users.length), limit: String(USERS_PAGE_SIZE) });
+        const { data, headers } = await fetchWithHeaders<User[]>(`/users/?${params}`, { user, signal });
+        users.push(...data);
+        const total = Number(headers.get("X-Total-Count") ?? users.length);
+        if (data.length === 0 || users.length >= total) return users;
+      }
+    },
     create: (data: UserCreate, user: ApiUserHeaders, signal?: AbortSignal) =>
       fetchAPI<User>("/users/", {
         method: "POST",
@@ -118,6 +139,13 @@ export const api = {
   documents: {
     list: (user: ApiUserHeaders, signal?: AbortSignal) =>
       fetchAPI<Document[]>("/documents/", { user, signal }),
+    permissions: (user: ApiUserHeaders, signal?: AbortSignal) =>
+      fetchAPI<DocumentPermissions>("/documents/permissions", { user, signal }),
+    search: (query: string, user: ApiUserHeaders, limit = 10, signal?: AbortSignal) =>
+      fetchAPI<Document[]>(
+        `/documents/search?q=${encodeURIComponent(query)}&limit=${limit}`,
+        { user, signal }
+      ),
     get: (id: number, user: ApiUserHeaders, signal?: AbortSignal) =>
       fetchAPI<Document>(`/documents/${id}`, { user, signal }),
     create: (
@@ -180,8 +208,21 @@ export const api = {
   chat: {
     listThreads: (user: ApiUserHeaders, signal?: AbortSignal) =>
       fetchAPI<ChatThread[]>("/chat/threads", { user, signal }),
-    getThreadMessages: (threadId: string, user: ApiUserHeaders, signal?: AbortSignal) =>
-      fetchAPI<ChatMessage[]>(`/chat/threads/${threadId}/messages`, { user, signal }),
+    getThreadMessages: async (
+      threadId: string,
+      user: ApiUserHeaders,
+      signal?: AbortSignal,
+      page: { before?: number; limit?: number } = {}
+    ): Promise<ChatMessagePage> => {
+      const params = new URLSearchParams({ limit: String(page.limit ?? 50) });
+      if (page.before !== undefined) params.set("before", String(page.before));
+      const { data, headers } = await fetchWithHeaders<ChatMessage[]>(
+        `/chat/threads/${threadId}/messages?${params}`,
+        { user, signal }
+      );
+      const next = headers.get("X-Next-Cursor");
+      return { messages: data, nextCursor: next === null ? undefined : Number(next) };
+    },
     deleteThread: (id: number, user: ApiUserHeaders, signal?: AbortSignal) =>
       fetchAPI<{ message: string }>(`/chat/threads/${id}`, {
         method: "DELETE",
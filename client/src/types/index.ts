@@ -10,6 +10,13 @@ export interface Document {
   readonly updated_at?: string;
 }
 
+export interface DocumentPermissions {
+  readonly read: boolean;
+  readonly create: boolean;
+  readonly update: boolean;
+  readonly delete: boolean;
+}
+
 export interface DocumentCreate {
   readonly title: string;
   readonly content: string;
@@ -39,6 +46,12 @@ export interface ChatMessage {
   readonly created_at?: string;
 }
 
+export interface ChatMessagePage {
+  readonly messages: ChatMessage[];
+  // Pass as `before` to fetch the next older page; undefined at the start of the thread.
+  readonly nextCursor?: number;
+}
+
 export interface ChatRequest {
   readonly message: string;
   readonly thread_id?: string;
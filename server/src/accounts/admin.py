@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import PermitOutbox, PermitSync
+
+@admin.register(PermitSync)
+class PermitSyncAdmin(admin.ModelAdmin):
+    list_display = ("user", "role", "synced_at")
+    list_filter = ("role",)
+
+@admin.register(PermitOutbox)
+class PermitOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "op", "user_key", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status", "op")
+    search_fields = ("user_key",)
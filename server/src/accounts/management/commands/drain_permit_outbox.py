@@ -0,0 +1,39 @@
+from __future__ import annotations
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from accounts.models import PermitOutbox
+from services import permit_outbox
+
+
+class Command(BaseCommand):
+    help = "Apply queued Permit.io user and role changes, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Drain everything currently due, then exit instead of polling.")
+        parser.add_argument("--batch-size", type=int, default=settings.PERMIT_OUTBOX_BATCH_SIZE)
+        parser.add_argument("--max-attempts", type=int, default=settings.PERMIT_OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds to sleep when nothing is due.")
+        parser.add_argument("--retry-failed", action="store_true",
+                            help="Put entries that exhausted their attempts back in the queue first.")
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            requeued = PermitOutbox.objects.filter(status=PermitOutbox.FAILED).update(
+                status=PermitOutbox.PENDING, attempts=0, next_attempt_at=timezone.now()
+            )
+            self.stdout.write(f"Requeued {requeued} failed entr{'y' if requeued == 1 else 'ies'}.")
+
+        while True:
+            close_old_connections()
+            result = permit_outbox.drain(batch_size=options["batch_size"], max_attempts=options["max_attempts"])
+            if result.processed:
+                self.stdout.write(f"done={result.done} retried={result.retried} failed={result.failed}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
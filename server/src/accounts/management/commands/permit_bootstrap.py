@@ -0,0 +1,18 @@
+from __future__ import annotations
+from django.core.management.base import BaseCommand
+from integrations.permit_bootstrap import PermitBootstrapper, fingerprint
+
+
+class Command(BaseCommand):
+    help = "Create the Permit tenant, resources, roles and permissions if their fingerprint changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Apply even if this fingerprint was already recorded.")
+
+    def handle(self, *args, **options):
+        current = fingerprint()
+        if PermitBootstrapper().bootstrap(force=options["force"]):
+            self.stdout.write(f"Applied Permit bootstrap {current[:12]}.")
+        else:
+            self.stdout.write(f"Permit bootstrap {current[:12]} already applied; nothing to do.")
@@ -0,0 +1,24 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PermitSync',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='permit_sync', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('role', models.CharField(max_length=64)),
+                ('tenant_key', models.CharField(max_length=128)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
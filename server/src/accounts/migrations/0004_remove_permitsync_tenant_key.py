@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_permit_bootstrap'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='permitsync',
+            name='tenant_key',
+        ),
+    ]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+User = settings.AUTH_USER_MODEL
+
+class PermitSync(models.Model):
+    """Role last pushed to Permit for a user (always in the configured tenant), so workers don't re-sync on every start."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="permit_sync")
+    role = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.role}"
+
+
+class PermitOutbox(models.Model):
+    """Pending Permit write, drained by ``manage.py drain_permit_outbox`` (and opportunistically in-process)."""
+
+    SYNC_USER = "sync_user"
+    ASSIGN_ROLE = "assign_role"
+    DELETE_USER = "delete_user"
+    OPS = [(SYNC_USER, "Sync user"), (ASSIGN_ROLE, "Assign role"), (DELETE_USER, "Delete user")]
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    SUPERSEDED = "superseded"
+    STATUSES = [(PENDING, "Pending"), (DONE, "Done"), (FAILED, "Failed"), (SUPERSEDED, "Superseded")]
+
+    op = models.CharField(max_length=32, choices=OPS)
+    user_key = models.CharField(max_length=128)
+    payload = models.JSONField(default=dict)
+    # Identical pending operations collapse into one row.
+    idempotency_key = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Set while a drainer is calling Permit with this row, even if it gets superseded meanwhile.
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status="pending"),
+                name="accounts_outbox_due_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(status="pending"),
+                name="accounts_outbox_pending_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.op}({self.user_key}) [{self.status}]"
+
+
+class PermitBootstrap(models.Model):
+    """Fingerprint of a Permit setup (tenant, resources, roles, permissions) that has been applied."""
+    fingerprint = models.CharField(max_length=64, primary_key=True)
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.fingerprint[:12]
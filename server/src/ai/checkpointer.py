@@ -0,0 +1,304 @@
+from __future__ import annotations
+import zlib
+from typing import Any, AsyncIterator, Callable, Iterator, Sequence, TypeVar
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from chat.models import GraphCheckpoint, GraphCheckpointWrite
+
+# Payloads above this size are zlib-compressed on top of the serializer's msgpack encoding.
+_COMPRESS_MIN_BYTES = 1024
+_COMPRESSED_SUFFIX = "+zlib"
+
+T = TypeVar("T")
+
+
+async def _released(fn: Callable[[], T]) -> T:
+    """Runs ``fn`` on Django's sync thread, then hands the connection back.
+
+    A graph run lasts as long as its LLM calls; without this, the first checkpoint read would keep a
+    connection open until the run ends.
+    """
+
+    def call() -> T:
+        try:
+            return fn()
+        finally:
+            if not connection.in_atomic_block:
+                close_old_connections()
+
+    return await sync_to_async(call)()
+
+
+class DjangoCheckpointSaver(BaseCheckpointSaver[int]):
+    """LangGraph checkpointer stored in the project database, shared by every worker.
+
+    Only the newest ``keep`` root checkpoints of a thread (plus anything written after
+    the oldest of them, including subgraph namespaces) are retained.
+    """
+
+    def __init__(self, *, keep: int | None = None, serde=None) -> None:
+        super().__init__(serde=serde)
+        self.keep = keep
+
+    def _dump(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= _COMPRESS_MIN_BYTES:
+            return type_ + _COMPRESSED_SUFFIX, zlib.compress(data)
+        return type_, data
+
+    def _load(self, type_: str, data: bytes | memoryview) -> Any:
+        data = bytes(data)
+        if type_.endswith(_COMPRESSED_SUFFIX):
+            type_, data = type_[: -len(_COMPRESSED_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _to_tuple(self, row: GraphCheckpoint, writes: Sequence[GraphCheckpointWrite]) -> CheckpointTuple:
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": row.thread_id,
+                    "checkpoint_ns": row.checkpoint_ns,
+                    "checkpoint_id": row.checkpoint_id,
+                }
+            },
+            checkpoint=self._load(row.checkpoint_type, row.checkpoint),
+            metadata=self._load(row.metadata_type, row.metadata),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": row.thread_id,
+                        "checkpoint_ns": row.checkpoint_ns,
+                        "checkpoint_id": row.parent_checkpoint_id,
+                    }
+                }
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[(w.task_id, w.channel, self._load(w.value_type, w.value)) for w in writes],
+        )
+
+    def _writes_for(self, rows: Sequence[GraphCheckpoint]) -> dict[tuple[str, str, str], list[GraphCheckpointWrite]]:
+        grouped: dict[tuple[str, str, str], list[GraphCheckpointWrite]] = {}
+        if not rows:
+            return grouped
+        qs = GraphCheckpointWrite.objects.filter(
+            thread_id__in={r.thread_id for r in rows},
+            checkpoint_id__in=[r.checkpoint_id for r in rows],
+        ).order_by("task_id", "idx")
+        for w in qs:
+            grouped.setdefault((w.thread_id, w.checkpoint_ns, w.checkpoint_id), []).append(w)
+        return grouped
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        qs = GraphCheckpoint.objects.filter(thread_id=thread_id, checkpoint_ns=checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            row = qs.filter(checkpoint_id=checkpoint_id).first()
+        else:
+            row = qs.order_by("-checkpoint_id").first()
+        if row is None:
+            return None
+        writes = self._writes_for([row]).get((row.thread_id, row.checkpoint_ns, row.checkpoint_id), [])
+        return self._to_tuple(row, writes)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        qs = GraphCheckpoint.objects.all()
+        if config:
+            qs = qs.filter(thread_id=config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                qs = qs.filter(checkpoint_ns=checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                qs = qs.filter(checkpoint_id=checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            qs = qs.filter(checkpoint_id__lt=before_id)
+        qs = qs.order_by("-checkpoint_id")
+        if limit is not None and not filter:
+            qs = qs[:limit]
+
+        rows = []
+        for row in qs:
+            if filter:
+                metadata = self._load(row.metadata_type, row.metadata)
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            rows.append(row)
+            if limit is not None and len(rows) >= limit:
+                break
+
+        writes = self._writes_for(rows)
+        for row in rows:
+            yield self._to_tuple(row, writes.get((row.thread_id, row.checkpoint_ns, row.checkpoint_id), []))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_data = self._dump(checkpoint)
+        metadata = get_checkpoint_metadata(config, metadata)
+        metadata_type, metadata_data = self._dump(metadata)
+
+        # Single-statement upsert: no read-then-write transaction for concurrent puts to contend on.
+        GraphCheckpoint.objects.bulk_create(
+            [
+                GraphCheckpoint(
+                    thread_id=thread_id,
+                    checkpoint_ns=checkpoint_ns,
+                    checkpoint_id=checkpoint["id"],
+                    parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                    checkpoint_type=checkpoint_type,
+                    checkpoint=checkpoint_data,
+                    metadata_type=metadata_type,
+                    metadata=metadata_data,
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["thread_id", "checkpoint_ns", "checkpoint_id"],
+            update_fields=["parent_checkpoint_id", "checkpoint_type", "checkpoint", "metadata_type", "metadata"],
+        )
+        # Prune once per turn, when the root graph records its input.
+        if not checkpoint_ns and metadata.get("source") == "input":
+            self.prune(thread_id)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        special: list[GraphCheckpointWrite] = []
+        regular: list[GraphCheckpointWrite] = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_data = self._dump(value)
+            row = GraphCheckpointWrite(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id=checkpoint_id,
+                task_id=task_id,
+                task_path=task_path,
+                idx=WRITES_IDX_MAP.get(channel, idx),
+                channel=channel,
+                value_type=value_type,
+                value=value_data,
+            )
+            (special if channel in WRITES_IDX_MAP else regular).append(row)
+
+        unique_fields = ["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"]
+        if special:
+            GraphCheckpointWrite.objects.bulk_create(
+                special,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=["channel", "value_type", "value", "task_path"],
+            )
+        if regular:
+            GraphCheckpointWrite.objects.bulk_create(regular, ignore_conflicts=True)
+
+    def delete_thread(self, thread_id: str) -> None:
+        GraphCheckpointWrite.objects.filter(thread_id=thread_id).delete()
+        GraphCheckpoint.objects.filter(thread_id=thread_id).delete()
+
+    def prune(self, thread_id: str, keep: int | None = None) -> int:
+        keep = self.keep if keep is None else keep
+        if not keep or keep <= 0:
+            return 0
+        kept = (
+            GraphCheckpoint.objects.filter(thread_id=thread_id, checkpoint_ns="")
+            .order_by("-checkpoint_id")
+            .values_list("checkpoint_id", flat=True)[keep - 1 : keep]
+        )
+        oldest_kept = next(iter(kept), None)
+        if oldest_kept is None:
+            return 0
+        # Checkpoint ids are time-ordered (uuid6), so this also drops stale subgraph namespaces.
+        GraphCheckpointWrite.objects.filter(thread_id=thread_id, checkpoint_id__lt=oldest_kept).delete()
+        deleted, _ = GraphCheckpoint.objects.filter(thread_id=thread_id, checkpoint_id__lt=oldest_kept).delete()
+        return deleted
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await _released(lambda: self.get_tuple(config))
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await _released(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await _released(lambda: self.put(config, checkpoint, metadata, new_versions))
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await _released(lambda: self.put_writes(config, writes, task_id, task_path))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await _released(lambda: self.delete_thread(thread_id))
+
+
+_checkpointer: BaseCheckpointSaver | None = None
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    global _checkpointer
+    if _checkpointer is None:
+        if settings.LANGGRAPH_CHECKPOINTER == "memory":
+            from langgraph.checkpoint.memory import MemorySaver
+            _checkpointer = MemorySaver()
+        else:
+            _checkpointer = DjangoCheckpointSaver(keep=settings.LANGGRAPH_CHECKPOINT_KEEP)
+    return _checkpointer
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Any, Sequence
+from typing_extensions import NotRequired
+from django.conf import settings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+# Longest slice of any one message fed to the summarizer.
+_SUMMARY_MESSAGE_CHARS = 2000
+
+# No callbacks: summary tokens must not surface as the agent's streamed reply.
+_QUIET = {"callbacks": []}
+
+_SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the summary with the new messages. Keep facts the assistant may need later: names, ids, "
+    "titles, decisions and open requests. Reply with the summary only, in at most {words} words."
+)
+
+
+class ThreadState(AgentState):
+    # Rolling summary of messages[:summarized_upto]; the model only sees what comes after it verbatim.
+    summary: NotRequired[str]
+    summarized_upto: NotRequired[int]
+
+
+def _line(message: AnyMessage) -> str:
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text = f"{text} [called {', '.join(c['name'] for c in message.tool_calls)}]".strip()
+    return f"{message.type}: {text[:_SUMMARY_MESSAGE_CHARS]}"
+
+
+class ContextWindow:
+    """pre_model_hook that keeps the last ``keep_turns`` turns verbatim and folds older ones into a summary.
+
+    Folding happens once ``batch`` extra turns have piled up, so the summarizer runs every ``batch`` turns
+    rather than on every one. The full history stays in the checkpoint; only the model input is trimmed.
+    """
+
+    def __init__(self, llm: BaseChatModel, keep_turns: int, batch: int, summary_words: int) -> None:
+        self.llm = llm
+        self.keep_turns = keep_turns
+        self.batch = batch
+        self.summary_words = summary_words
+
+    def _plan(self, state: dict[str, Any]) -> tuple[str, int, int]:
+        messages = state["messages"]
+        summary, upto = state.get("summary") or "", state.get("summarized_upto") or 0
+        if upto > len(messages):
+            summary, upto = "", 0
+        turns = [i for i in range(upto, len(messages)) if isinstance(messages[i], HumanMessage)]
+        cut = turns[-self.keep_turns] if len(turns) > self.keep_turns + self.batch else upto
+        return summary, upto, cut
+
+    def _prompt(self, summary: str, folded: Sequence[AnyMessage]) -> list[AnyMessage]:
+        transcript = "\n".join(_line(m) for m in folded)
+        return [
+            SystemMessage(content=_SUMMARY_PROMPT.format(words=self.summary_words)),
+            HumanMessage(content=f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"),
+        ]
+
+    def _update(self, state: dict[str, Any], summary: str, cut: int) -> dict[str, Any]:
+        kept = list(state["messages"][cut:])
+        if summary:
+            kept.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+        return {"llm_input_messages": kept, "summary": summary, "summarized_upto": cut}
+
+    def invoke(self, state: dict[str, Any]) -> dict[str, Any]:
+        summary, upto, cut = self._plan(state)
+        if cut > upto:
+            summary = self.llm.invoke(self._prompt(summary, state["messages"][upto:cut]), _QUIET).content
+        return self._update(state, summary, cut)
+
+    async def ainvoke(self, state: dict[str, Any]) -> dict[str, Any]:
+        summary, upto, cut = self._plan(state)
+        if cut > upto:
+            summary = (await self.llm.ainvoke(self._prompt(summary, state["messages"][upto:cut]), _QUIET)).content
+        return self._update(state, summary, cut)
+
+
+def context_hook(llm: BaseChatModel) -> RunnableLambda | None:
+    """The pre_model_hook for agents built on ``llm``, or None when LANGGRAPH_HISTORY_TURNS is 0."""
+    if settings.LANGGRAPH_HISTORY_TURNS <= 0:
+        return None
+    window = ContextWindow(
+        llm,
+        keep_turns=settings.LANGGRAPH_HISTORY_TURNS,
+        batch=settings.LANGGRAPH_SUMMARY_BATCH,
+        summary_words=settings.LANGGRAPH_SUMMARY_WORDS,
+    )
+    return RunnableLambda(window.invoke, afunc=window.ainvoke, name="context_window")
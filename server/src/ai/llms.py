@@ -1,7 +1,16 @@
 from __future__ import annotations
+from functools import lru_cache
 from django.conf import settings
 from langchain_openai import ChatOpenAI
 
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
 def get_openai_model(model: str | None = None) -> ChatOpenAI:
-    chosen = model or "gpt-4o-mini"
-    return ChatOpenAI(model=chosen, temperature=0, max_retries=2, api_key=settings.OPENAI_API_KEY)
+    return _openai_model(model or DEFAULT_MODEL)
+
+
+@lru_cache(maxsize=None)
+def _openai_model(model: str) -> ChatOpenAI:
+    # One client per model name so every agent shares the same HTTP connection pool.
+    return ChatOpenAI(model=model, temperature=0, max_retries=2, api_key=settings.OPENAI_API_KEY)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+import threading
+from typing import Any, Callable
+from ai import agents
+from ai.supervisors import get_supervisor
+
+DOCUMENTS = "Documents"
+MOVIES = "Movies"
+SUPERVISOR = "Supervisor"
+
+
+def _build_supervisor(model: str | None, checkpointer) -> Any:
+    # Members run as subgraphs of the supervisor and inherit its checkpointer.
+    members = [get_agent(DOCUMENTS, model=model), get_agent(MOVIES, model=model)]
+    return get_supervisor(model=model, checkpointer=checkpointer, members=members)
+
+
+_BUILDERS: dict[str, Callable[[str | None, Any], Any]] = {
+    DOCUMENTS: lambda model, checkpointer: agents.get_document_agent(model=model, checkpointer=checkpointer),
+    MOVIES: lambda model, checkpointer: agents.get_movie_discovery_agent(model=model, checkpointer=checkpointer),
+    SUPERVISOR: _build_supervisor,
+}
+
+_compiled: dict[tuple[str, str | None, int], Any] = {}
+_lock = threading.RLock()
+
+
+def get_agent(name: str, model: str | None = None, checkpointer=None):
+    """Return the compiled graph for ``name``, building it on first use for this (model, checkpointer)."""
+    if name not in _BUILDERS:
+        raise ValueError(f"Unknown agent: {name}")
+    key = (name, model, id(checkpointer))
+    graph = _compiled.get(key)
+    if graph is not None:
+        return graph
+    with _lock:
+        graph = _compiled.get(key)
+        if graph is None:
+            graph = _compiled[key] = _BUILDERS[name](model, checkpointer)
+    return graph
+
+
+def reset() -> None:
+    with _lock:
+        _compiled.clear()
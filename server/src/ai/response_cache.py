@@ -0,0 +1,61 @@
+from __future__ import annotations
+import re
+from typing import Any, Iterable
+from django.conf import settings
+from langchain_core.callbacks import BaseCallbackHandler
+from ai import registry
+from ai.tools.movies_tools import movie_discovery_tools
+from integrations.cache import TTLCache
+
+# Final answers to repeatable questions, keyed on (agent, tenant, normalized prompt). Opt-in via AGENT_RESPONSE_CACHE.
+response_cache = TTLCache(
+    maxsize=settings.AGENT_RESPONSE_CACHE_SIZE if settings.AGENT_RESPONSE_CACHE else 0,
+    ttl=settings.AGENT_RESPONSE_CACHE_TTL,
+)
+
+# Answers built only from these tools are the same for every user. Document tools are left out entirely:
+# they mutate or read the caller's own documents.
+_SHARED_TOOLS = frozenset(t.name for t in movie_discovery_tools)
+_HANDOFF_PREFIX = "transfer_"
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_RE = re.compile(r"[\s?!.]+$")
+
+
+def normalize(prompt: str) -> str:
+    return _TRAILING_RE.sub("", _SPACE_RE.sub(" ", prompt).strip().casefold())
+
+
+def _key(agent: str, tenant: str, prompt: str) -> tuple[str, str, str]:
+    return (agent, tenant, normalize(prompt))
+
+
+def cacheable(tools_called: Iterable[str]) -> bool:
+    """True when the turn used at least one shared read-only tool and nothing else but agent handoffs."""
+    used = [name for name in tools_called if not name.startswith(_HANDOFF_PREFIX)]
+    return bool(used) and all(name in _SHARED_TOOLS for name in used)
+
+
+class ToolRecorder(BaseCallbackHandler):
+    """Collects the name of every tool a run calls, including inside specialist subgraphs."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+
+    def on_tool_start(self, serialized: dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.names.append(kwargs.get("name") or (serialized or {}).get("name") or "")
+
+
+def lookup(agent: str, tenant: str, prompt: str) -> str | None:
+    if not response_cache.enabled or agent == registry.DOCUMENTS:
+        return None
+    return response_cache.get(_key(agent, tenant, prompt))
+
+
+def store(agent: str, tenant: str, prompt: str, tools_called: Iterable[str], response: str) -> bool:
+    if not response_cache.enabled or not response or not cacheable(tools_called):
+        return False
+    response_cache.set(_key(agent, tenant, prompt), response)
+    return True
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import re
+import threading
+from ai import registry
+
+# Only short, single-domain requests are routed; anything longer may mix intents and goes to the supervisor.
+_MAX_CHARS = 300
+
+_RULES: dict[str, re.Pattern[str]] = {
+    registry.DOCUMENTS: re.compile(r"\b(documents?|docs?)\b", re.IGNORECASE),
+    registry.MOVIES: re.compile(
+        r"\b(movies?|films?|cinema|box office|tmdb|imdb|trailers?|filmograph(y|ies))\b", re.IGNORECASE
+    ),
+}
+
+
+class Router:
+    """Sends requests that clearly belong to one specialist straight to it, skipping the supervisor's routing call."""
+
+    def __init__(self, rules: dict[str, re.Pattern[str]]) -> None:
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._hits = {name: 0 for name in rules}
+        self._misses = 0
+
+    def route(self, text: str) -> str | None:
+        """The specialist for ``text``, or None to leave it to the supervisor."""
+        matched = [name for name, rule in self.rules.items() if rule.search(text)] if len(text) <= _MAX_CHARS else []
+        target = matched[0] if len(matched) == 1 else None
+        with self._lock:
+            if target is None:
+                self._misses += 1
+            else:
+                self._hits[target] += 1
+        return target
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(self._hits.values())
+            total = hits + self._misses
+            return {
+                "hits": dict(self._hits),
+                "misses": self._misses,
+                "hit_ratio": hits / total if total else 0.0,
+            }
+
+
+router = Router(_RULES)
+
+
+def select(agent: str, text: str) -> str:
+    """``agent`` unless it is the supervisor and the router can pick the specialist itself."""
+    if agent != registry.SUPERVISOR:
+        return agent
+    return router.route(text) or agent
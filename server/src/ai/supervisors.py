@@ -1,13 +1,18 @@
 from __future__ import annotations
 from langgraph_supervisor import create_supervisor
+from ai.context import ThreadState, context_hook
 from ai.llms import get_openai_model
 from ai import agents
 
-def get_supervisor(model: str | None = None, checkpointer=None):
+def get_supervisor(model: str | None = None, checkpointer=None, members: list | None = None):
     llm = get_openai_model(model=model)
+    if members is None:
+        members = [agents.get_document_agent(), agents.get_movie_discovery_agent()]
     return create_supervisor(
-        agents=[agents.get_document_agent(), agents.get_movie_discovery_agent()],
+        agents=members,
         model=llm,
+        pre_model_hook=context_hook(llm),
+        state_schema=ThreadState,
         prompt=(
             "You are a supervisor that routes tasks to specialist agents. "
             "When an agent returns information (like movie lists or document details), "
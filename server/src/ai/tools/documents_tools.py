@@ -3,13 +3,10 @@ from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from domain.auth.types import Identity
 from domain.documents.schemas import DocumentCreate
-from integrations.authorizer import Authorizer
+from domain.documents.types import DocumentCursor
 from repositories.documents_repo import DocumentsRepository
-from services.documents_service import DocumentsService
 
 _repo = DocumentsRepository()
-_auth = Authorizer()
-_svc = DocumentsService(repo=_repo, auth=_auth)
 
 def _ctx(config: RunnableConfig) -> tuple[Identity, int]:
     cfg = (config.get("configurable") or config.get("metadata") or {})
@@ -20,10 +17,23 @@ def _ctx(config: RunnableConfig) -> tuple[Identity, int]:
     return Identity(user_key=str(user_id), tenant_key=str(tenant)), int(user_id)
 
 @tool
-def list_documents(limit: int = 5, config: RunnableConfig = {}):
-    """List recent documents for the current user."""
+def list_documents(limit: int = 5, cursor: str | None = None, config: RunnableConfig = {}):
+    """List recent documents for the current user. Pass back next_cursor to get the following page."""
     _, owner_id = _ctx(config)
-    docs = _repo.list_recent(owner_id=owner_id, limit=limit)
+    limit = min(max(limit, 1), 100)
+    after = DocumentCursor.decode(cursor) if cursor else None
+    docs, next_cursor = _repo.list_page(owner_id=owner_id, limit=limit, after=after, summary=True)
+    return {
+        "documents": [{"id": d.id, "title": d.title} for d in docs],
+        "next_cursor": next_cursor.encode() if next_cursor else None,
+    }
+
+@tool
+def search_documents(query: str, limit: int = 5, config: RunnableConfig = {}):
+    """Search the current user's documents by title and content, best matches first."""
+    _, owner_id = _ctx(config)
+    limit = min(max(limit, 1), 25)
+    docs = _repo.search(owner_id=owner_id, query=query, limit=limit, summary=True)
     return [{"id": d.id, "title": d.title} for d in docs]
 
 @tool
@@ -47,4 +57,4 @@ def delete_document(document_id: int, config: RunnableConfig = {}):
     _repo.soft_delete(owner_id=owner_id, document_id=document_id)
     return {"message": "success"}
 
-document_tools = [create_document, list_documents, get_document, delete_document]
+document_tools = [create_document, list_documents, search_documents, get_document, delete_document]
@@ -14,4 +14,9 @@ def movie_detail(movie_id: int, config: RunnableConfig = {}):
     """Get detailed information about a specific movie by its ID."""
     return tmdb_client.movie_detail(movie_id=movie_id)
 
-movie_discovery_tools = [search_movies, movie_detail]
+@tool
+def movie_details(movie_ids: list[int], config: RunnableConfig = {}):
+    """Get detailed information about several movies at once by their IDs. Prefer this over repeated movie_detail calls."""
+    return tmdb_client.movie_details_many(movie_ids[:20])
+
+movie_discovery_tools = [search_movies, movie_detail, movie_details]
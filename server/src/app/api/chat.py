@@ -1,24 +1,26 @@
 from __future__ import annotations
+import asyncio
+import json
 import uuid
-from typing import Literal
+from dataclasses import dataclass
+from typing import Literal, Sequence
+from asgiref.sync import sync_to_async
 from ninja import Router, Schema, Header
 from ninja.errors import HttpError
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
 
-from ai import agents
-from ai.supervisors import get_supervisor
-from langchain_core.messages import HumanMessage
+from ai import registry, response_cache, router as agent_router
+from ai.checkpointer import get_checkpointer
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
-try:
-    from langgraph.checkpoint.memory import MemorySaver
-    CHECKPOINTER = MemorySaver()
-except Exception:
-    CHECKPOINTER = None
+CHECKPOINTER = get_checkpointer()
 
-from domain.auth.types import Identity
-from integrations.authorizer import Authorizer
+from app.api.streaming import ExportFormat, stream_rows
+from app.middleware import request_identity
+from integrations.authorizer import AsyncAuthorizer
 from repositories.chat_repo import ChatRepository
 from services.chat_service import ChatService
 from domain.chat.schemas import ChatThreadOut, ChatMessageOut, ChatThreadUpdate, ChatMessageUpdate
@@ -27,46 +29,8 @@ router = Router(tags=["chat"])
 
 # Force reload
 _repo = ChatRepository()
-_auth = Authorizer()
+_auth = AsyncAuthorizer()
 _svc = ChatService(repo=_repo, auth=_auth)
-User = get_user_model()
-_synced_users = set()
-
-document_agent = agents.get_document_agent(checkpointer=CHECKPOINTER)
-movie_agent = agents.get_movie_discovery_agent(checkpointer=CHECKPOINTER)
-supervisor = get_supervisor(checkpointer=CHECKPOINTER)
-
-
-def _identity_from_headers(
-    user_id: int, 
-    tenant: str | None, 
-    role: str = "user", 
-    username: str = "user"
-) -> tuple[Identity, int]:
-    tenant_key = (tenant or settings.PERMIT_TENANT_KEY or "default").strip() or "default"
-    
-    user, _ = User.objects.get_or_create(
-        id=user_id,
-        defaults={
-            "username": username,
-            "email": f"{username}@local.dev",
-            "first_name": username
-        }
-    )
-    
-    sync_key = f"{user_id}:{role}:{tenant_key}"
-    if sync_key not in _synced_users:
-        try:
-            _auth.sync_user(user_key=str(user_id), email=f"{username}@local.dev", first_name=username)
-            if role == "admin":
-                _auth.assign_admin(user_key=str(user_id))
-            else:
-                _auth.assign_user(user_key=str(user_id))
-        except Exception as e:
-            print(f"Auth Sync Error: {e}")
-        _synced_users.add(sync_key)
-
-    return Identity(user_key=str(user_id), tenant_key=tenant_key), int(user_id)
 
 
 class ChatRequest(Schema):
@@ -82,9 +46,28 @@ class ChatResponse(Schema):
     thread_id: str
 
 
-def _invoke_agent(compiled_agent, user_id: int, text: str, thread_id: str, tenant: str):
-    cfg = {"configurable": {"user_id": user_id, "thread_id": thread_id, "tenant": tenant}}
-    result = compiled_agent.invoke({"messages": [HumanMessage(content=text)]}, config=cfg)
+def _config(user_id: int, thread_id: str, tenant: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"user_id": user_id, "thread_id": thread_id, "tenant": tenant}
+    if checkpoint_id:
+        # Time travel: run from this checkpoint, forking the thread instead of continuing its latest state.
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+async def _invoke_agent(
+    compiled_agent,
+    user_id: int,
+    text: str,
+    thread_id: str,
+    tenant: str,
+    checkpoint_id: str | None = None,
+    history: Sequence[BaseMessage] = (),
+    tools: response_cache.ToolRecorder | None = None,
+):
+    cfg = _config(user_id, thread_id, tenant, checkpoint_id)
+    if tools is not None:
+        cfg["callbacks"] = [tools]
+    result = await compiled_agent.ainvoke({"messages": [*history, HumanMessage(content=text)]}, config=cfg)
     msgs = result.get("messages", [])
     if not msgs:
         return ""
@@ -92,8 +75,34 @@ def _invoke_agent(compiled_agent, user_id: int, text: str, thread_id: str, tenan
     return last.content if hasattr(last, "content") else str(last)
 
 
+# Node that produces the final answer in each graph; cached answers are written to the thread as if from it.
+_ANSWER_NODES = {registry.SUPERVISOR: "supervisor"}
+
+
+async def _cached_answer(compiled_agent, turn: _Turn) -> str | None:
+    """A cached reply for ``turn``, recorded into the thread's graph state so later turns still see it."""
+    if turn.checkpoint_id is not None:
+        # A follow-up can depend on earlier turns; only context-free answers are stored, so only those are reused.
+        return None
+    cached = response_cache.lookup(turn.agent, turn.tenant, turn.message)
+    if cached is None:
+        return None
+    await compiled_agent.aupdate_state(
+        _config(turn.owner_id, turn.thread_id, turn.tenant),
+        {"messages": [HumanMessage(content=turn.message), AIMessage(content=cached)]},
+        as_node=_ANSWER_NODES.get(turn.agent, "agent"),
+    )
+    return cached
+
+
+def _remember_answer(turn: _Turn, tools: Sequence[str], response_text: str) -> None:
+    # Only answers given without earlier context are reusable in other threads.
+    if turn.checkpoint_id is None:
+        response_cache.store(turn.agent, turn.tenant, turn.message, tools, response_text)
+
+
 @router.get("/threads", response=list[ChatThreadOut])
-def list_threads(
+async def list_threads(
     request,
     limit: int = 20,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -102,26 +111,48 @@ def list_threads(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        return _svc.list_threads(identity=identity, owner_id=owner_id)
+        identity, owner_id = request_identity(request)
+        return await sync_to_async(_svc.list_threads)(identity=identity, owner_id=owner_id)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except Exception as e:
         raise HttpError(500, str(e))
 
 
+@router.get("/threads/export")
+async def export_threads(
+    request,
+    format: ExportFormat = "ndjson",
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    identity, owner_id = request_identity(request)
+    target_owner_id = None if x_user_role == "admin" else owner_id
+    return stream_rows(_svc.export_threads(identity=identity, owner_id=target_owner_id), format, "threads")
+
+
 @router.get("/threads/{thread_id}/messages", response=list[ChatMessageOut])
-def get_thread_messages(
+async def get_thread_messages(
     request,
     thread_id: str,
+    response: HttpResponse,
+    before: int | None = None,
+    limit: int = 50,
     x_user_id: int = Header(..., alias="X-User-Id"),
     x_tenant: str | None = Header(None, alias="X-Tenant"),
     x_user_role: str = Header("user", alias="X-User-Role"),
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        return _svc.get_thread_messages(identity=identity, owner_id=owner_id, thread_uuid=thread_id)
+        identity, owner_id = request_identity(request)
+        messages, next_before = await sync_to_async(_svc.get_thread_messages)(
+            identity=identity, owner_id=owner_id, thread_uuid=thread_id, before=before, limit=limit
+        )
+        if next_before is not None:
+            response["X-Next-Cursor"] = str(next_before)
+        return messages
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except Exception as e:
@@ -129,7 +160,7 @@ def get_thread_messages(
 
 
 @router.delete("/threads/{thread_id}")
-def delete_thread(
+async def delete_thread(
     request,
     thread_id: int,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -138,8 +169,8 @@ def delete_thread(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        _svc.delete_thread(identity=identity, owner_id=owner_id, thread_id=thread_id)
+        identity, owner_id = request_identity(request)
+        await sync_to_async(_svc.delete_thread)(identity=identity, owner_id=owner_id, thread_id=thread_id)
         return {"message": "success"}
     except PermissionError:
         raise HttpError(403, "Forbidden")
@@ -149,7 +180,7 @@ def delete_thread(
         raise HttpError(500, str(e))
 
 @router.put("/threads/{thread_id}")
-def update_thread(
+async def update_thread(
     request,
     thread_id: int,
     payload: ChatThreadUpdate,
@@ -159,8 +190,8 @@ def update_thread(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        _svc.update_thread_title(identity=identity, owner_id=owner_id, thread_id=thread_id, title=payload.title)
+        identity, owner_id = request_identity(request)
+        await sync_to_async(_svc.update_thread_title)(identity=identity, owner_id=owner_id, thread_id=thread_id, title=payload.title)
         return {"message": "success"}
     except PermissionError:
         raise HttpError(403, "Forbidden")
@@ -170,7 +201,7 @@ def update_thread(
         raise HttpError(500, str(e))
 
 @router.put("/messages/{message_id}", response=ChatResponse)
-def update_message(
+async def update_message(
     request,
     message_id: int,
     payload: ChatMessageUpdate,
@@ -180,19 +211,28 @@ def update_message(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        msg_out = _svc.update_message(identity=identity, owner_id=owner_id, message_id=message_id, content=payload.content)
+        identity, owner_id = request_identity(request)
+        msg_out = await sync_to_async(_svc.update_message)(identity=identity, owner_id=owner_id, message_id=message_id, content=payload.content)
         
-        thread = _repo.get_thread(owner_id=owner_id, thread_id=msg_out.thread_id)
+        thread = await sync_to_async(_repo.get_thread)(owner_id=owner_id, thread_id=msg_out.thread_id)
         
         # Delete subsequent messages to "rewind" conversation from this point
-        _repo.delete_messages_after(thread_id=thread.id, created_after=msg_out.created_at)
+        await sync_to_async(_repo.delete_messages_after)(
+            thread_id=thread.id, created_after=msg_out.created_at, after_id=msg_out.id
+        )
+        checkpoint_id, history = await _fork_point(thread, msg_out)
+        await _release_connection()
         
-        # Regenerate response
-        # We default to supervisor agent as we don't track per-turn agent selection currently
-        response_text = _invoke_agent(supervisor, owner_id, msg_out.content, thread.uuid, identity.tenant_key)
+        # Regenerate with the agent that answered originally, recomputing only this turn onwards
+        agent = msg_out.agent or registry.SUPERVISOR
+        response_text = await _invoke_agent(
+            _select_agent(agent), owner_id, msg_out.content, thread.uuid, identity.tenant_key,
+            checkpoint_id=checkpoint_id, history=history,
+        )
         
-        _repo.add_message(thread_id=thread.id, role="assistant", content=response_text)
+        await sync_to_async(_repo.record_turn)(
+            owner_id=owner_id, uuid=thread.uuid, title=thread.title, messages=[("assistant", response_text)], agent=agent
+        )
         
         return ChatResponse(response=response_text, thread_id=thread.uuid)
     except PermissionError:
@@ -203,8 +243,137 @@ def update_message(
         raise HttpError(500, str(e))
 
 
+def _select_agent(name: str):
+    return registry.get_agent(name, checkpointer=CHECKPOINTER)
+
+
+async def _head_checkpoint(thread_id: str) -> str | None:
+    latest = await CHECKPOINTER.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+    return latest.config["configurable"]["checkpoint_id"] if latest else None
+
+
+async def _fork_point(thread, message: ChatMessageOut) -> tuple[str | None, list[BaseMessage]]:
+    """Where to regenerate ``message`` from: its starting checkpoint, or else a replay of the earlier transcript.
+
+    The replay covers first turns, messages recorded before checkpoints were tracked and checkpoints
+    pruned since; the thread's graph state is reset so the stale future can't leak in.
+    """
+    checkpoint_id = await sync_to_async(_repo.get_checkpoint_id)(message.id)
+    if checkpoint_id and await CHECKPOINTER.aget_tuple(
+        {"configurable": {"thread_id": thread.uuid, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}}
+    ):
+        return checkpoint_id, []
+    transcript = await sync_to_async(_repo.get_messages_before)(
+        thread_id=thread.id, created_before=message.created_at, before_id=message.id
+    )
+    await CHECKPOINTER.adelete_thread(thread.uuid)
+    return None, [HumanMessage(content=c) if role == "user" else AIMessage(content=c) for role, c in transcript]
+
+
+def _title(message: str) -> str:
+    return message[:30] + "..." if len(message) > 30 else message
+
+
+@dataclass(frozen=True)
+class _Turn:
+    owner_id: int
+    thread_id: str
+    tenant: str
+    agent: str
+    message: str
+    # Latest graph checkpoint before this turn; None on a new thread.
+    checkpoint_id: str | None
+
+
+async def _start_turn(owner_id: int, payload: ChatRequest) -> _Turn:
+    # The checkpointer is keyed by uuid alone, so another owner's thread must be refused before it is read.
+    if payload.thread_id and await sync_to_async(_repo.thread_owned_by_other)(owner_id, payload.thread_id):
+        raise HttpError(404, "Thread not found")
+    thread_id = payload.thread_id or str(uuid.uuid4())
+    tenant = payload.tenant or settings.PERMIT_TENANT_KEY or "default"
+    checkpoint_id = await _head_checkpoint(thread_id) if payload.thread_id else None
+    agent = agent_router.select(payload.agent, payload.message) if settings.AGENT_FAST_ROUTE else payload.agent
+    return _Turn(owner_id, thread_id, tenant, agent, payload.message, checkpoint_id)
+
+
+async def _release_connection() -> None:
+    # Nothing touches the database until the agent finishes, so don't hold a connection through the LLM calls.
+    await sync_to_async(close_old_connections)()
+
+
+async def _record_turn(turn: _Turn, response_text: str | None) -> None:
+    messages = [("user", turn.message)]
+    if response_text is not None:
+        messages.append(("assistant", response_text))
+    await sync_to_async(_repo.record_turn)(
+        owner_id=turn.owner_id,
+        uuid=turn.thread_id,
+        title=_title(turn.message),
+        messages=messages,
+        agent=turn.agent,
+        checkpoint_id=turn.checkpoint_id,
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_agent(compiled_agent, turn: _Turn):
+    cfg = _config(turn.owner_id, turn.thread_id, turn.tenant)
+    yield _sse("start", {"thread_id": turn.thread_id})
+
+    response_text = ""
+    tools: list[str] = []
+    recorded = False
+    try:
+        cached = await _cached_answer(compiled_agent, turn)
+        if cached is not None:
+            await _record_turn(turn, cached)
+            recorded = True
+            yield _sse("token", {"content": cached, "node": ""})
+            yield _sse("done", {"response": cached, "thread_id": turn.thread_id, "cached": True})
+            return
+
+        async for event in compiled_agent.astream_events(
+            {"messages": [HumanMessage(content=turn.message)]}, config=cfg, version="v2"
+        ):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if isinstance(content, str) and content:
+                    # Outermost graph node, e.g. "supervisor" or "movie-assistant" under the supervisor.
+                    ns = event.get("metadata", {}).get("checkpoint_ns", "")
+                    yield _sse("token", {"content": content, "node": ns.split("|")[0].split(":")[0]})
+            elif kind == "on_tool_start":
+                tools.append(event["name"])
+                yield _sse("tool_start", {"name": event["name"], "input": event["data"].get("input")})
+            elif kind == "on_tool_end":
+                yield _sse("tool_end", {"name": event["name"]})
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                msgs = (event["data"].get("output") or {}).get("messages", [])
+                if msgs:
+                    last = msgs[-1]
+                    response_text = last.content if hasattr(last, "content") else str(last)
+        await _record_turn(turn, response_text)
+        recorded = True
+    except Exception as e:
+        await _record_turn(turn, None)
+        yield _sse("error", {"detail": str(e)})
+        return
+    except (GeneratorExit, asyncio.CancelledError):
+        # The client went away mid-run. The graph checkpoint already holds the turn, so the transcript must too;
+        # shielded so a second cancellation can't drop the write.
+        if not recorded:
+            await asyncio.shield(_record_turn(turn, response_text or None))
+        raise
+
+    _remember_answer(turn, tools, response_text)
+    yield _sse("done", {"response": response_text, "thread_id": turn.thread_id})
+
+
 @router.post("/", response=ChatResponse)
-def chat(
+async def chat(
     request, 
     payload: ChatRequest,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -213,33 +382,48 @@ def chat(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        _, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-
-        thread_id = payload.thread_id or str(uuid.uuid4())
-        tenant = payload.tenant or settings.PERMIT_TENANT_KEY or "default"
-       
-        db_thread = _repo.get_thread_by_uuid(owner_id=owner_id, uuid=thread_id)
-        if not db_thread:
-            title = payload.message[:30] + "..." if len(payload.message) > 30 else payload.message
-            db_thread = _repo.create_thread(owner_id=owner_id, title=title, uuid=thread_id)
-        else:
-            db_thread.save()
-        
-        _repo.add_message(thread_id=db_thread.id, role="user", content=payload.message)
-        
-        if payload.agent == "Documents":
-            agent = document_agent
-        elif payload.agent == "Movies":
-            agent = movie_agent
-        else:
-            agent = supervisor
-       
-        response_text = _invoke_agent(agent, owner_id, payload.message, thread_id, tenant)
-        
-        _repo.add_message(thread_id=db_thread.id, role="assistant", content=response_text)
-        
-        return ChatResponse(response=response_text, thread_id=thread_id)
+        _, owner_id = request_identity(request)
+        turn = await _start_turn(owner_id, payload)
+        await _release_connection()
+        compiled_agent = _select_agent(turn.agent)
+        tools = response_cache.ToolRecorder()
+        try:
+            response_text = await _cached_answer(compiled_agent, turn)
+            if response_text is None:
+                response_text = await _invoke_agent(
+                    compiled_agent, owner_id, turn.message, turn.thread_id, turn.tenant, tools=tools
+                )
+                _remember_answer(turn, tools.names, response_text)
+        except BaseException:
+            # Also on cancellation when the client disconnects: the graph checkpoint already holds the turn.
+            await asyncio.shield(_record_turn(turn, None))
+            raise
+
+        await _record_turn(turn, response_text)
+        return ChatResponse(response=response_text, thread_id=turn.thread_id)
+    except HttpError:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HttpError(500, str(e))
\ No newline at end of file
+        raise HttpError(500, str(e))
+
+
+@router.post("/stream")
+async def chat_stream(
+    request,
+    payload: ChatRequest,
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    _, owner_id = request_identity(request)
+    turn = await _start_turn(owner_id, payload)
+    await _release_connection()
+
+    stream = _stream_agent(_select_agent(turn.agent), turn)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,73 +1,143 @@
 from __future__ import annotations
+from typing import Literal
 
 from ninja import Router, Header
 from ninja.errors import HttpError
-from django.contrib.auth import get_user_model
-from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
 
-from domain.auth.types import Identity
-from domain.documents.schemas import DocumentCreate, DocumentUpdate, DocumentOut
+from app.api.streaming import ExportFormat, stream_rows
+from app.middleware import request_identity
+from domain.documents.schemas import (
+    DocumentCreate,
+    DocumentImportOut,
+    DocumentOut,
+    DocumentPermissionsOut,
+    DocumentSummaryOut,
+    DocumentUpdate,
+)
 from repositories.documents_repo import DocumentsRepository
-from integrations.authorizer import Authorizer
-from services.documents_service import DocumentsService
+from integrations.authorizer import AsyncAuthorizer
+from services.documents_service import DocumentsService, ImportTooLarge
 
 router = Router(tags=["documents"])
 
+# "summary" omits content and never loads it from the database; fetch /{id} for the body.
+DocumentView = Literal["full", "summary"]
+
 _repo = DocumentsRepository()
-_auth = Authorizer()
+_auth = AsyncAuthorizer()
 _svc = DocumentsService(repo=_repo, auth=_auth)
 
-User = get_user_model()
-
-
-_synced_users = set()
-
-def _identity_from_headers(
-    user_id: int, 
-    tenant: str | None, 
-    role: str = "user", 
-    username: str = "user"
-) -> tuple[Identity, int]:
-    tenant_key = (tenant or settings.PERMIT_TENANT_KEY or "default").strip() or "default"
-    
-    _, _ = User.objects.get_or_create(
-        id=user_id,
-        defaults={
-            "username": username,
-            "email": f"{username}@local.dev",
-            "first_name": username
-        }
-    )
- 
-    sync_key = f"{user_id}:{role}:{tenant_key}"
-    if sync_key not in _synced_users:
-        email = f"{username}@local.dev"
-        _auth.sync_user(user_key=str(user_id), email=email, first_name=username)
-        
-        if role == "admin":
-            _auth.assign_admin(user_key=str(user_id))
-        else:
-            _auth.assign_user(user_key=str(user_id))
-            
-        _synced_users.add(sync_key)
-
-    return Identity(user_key=str(user_id), tenant_key=tenant_key), int(user_id)
-
-
-@router.get("/", response=list[DocumentOut])
-def list_documents(
+
+@router.get("/", response=list[DocumentOut] | list[DocumentSummaryOut])
+async def list_documents(
     request,
+    response: HttpResponse,
     limit: int = 10,
+    cursor: str | None = None,
+    view: DocumentView = "full",
     x_user_id: int = Header(..., alias="X-User-Id"),
     x_tenant: str | None = Header(None, alias="X-Tenant"),
     x_user_role: str = Header("user", alias="X-User-Role"),
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
+        identity, owner_id = request_identity(request)
         target_owner_id = None if x_user_role == "admin" else owner_id
-        return _svc.list_recent(identity=identity, owner_id=target_owner_id, limit=limit)
+        items, next_cursor = await _svc.list_recent(
+            identity=identity, owner_id=target_owner_id, limit=limit, cursor=cursor, summary=view == "summary"
+        )
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return items
+    except PermissionError:
+        raise HttpError(403, "Forbidden")
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    except Exception as e:
+        raise HttpError(500, str(e))
+
+
+@router.get("/permissions", response=DocumentPermissionsOut)
+async def document_permissions(
+    request,
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    try:
+        identity, _ = request_identity(request)
+        return await _svc.permissions(identity=identity)
+    except Exception as e:
+        raise HttpError(500, str(e))
+
+
+@router.get("/export")
+async def export_documents(
+    request,
+    format: ExportFormat = "ndjson",
+    view: DocumentView = "full",
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    try:
+        identity, owner_id = request_identity(request)
+        target_owner_id = None if x_user_role == "admin" else owner_id
+        rows = await _svc.export(identity=identity, owner_id=target_owner_id, summary=view == "summary")
+    except PermissionError:
+        raise HttpError(403, "Forbidden")
+    return stream_rows(rows, format, "documents")
+
+
+@router.post("/bulk", response=DocumentImportOut)
+async def bulk_create_documents(
+    request,
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    """Body is a JSON array of documents, or NDJSON when sent as application/x-ndjson.
+
+    The body is read from the request stream rather than request.body, so the import is capped by
+    DOCUMENT_IMPORT_MAX_BYTES instead of DATA_UPLOAD_MAX_MEMORY_SIZE.
+    """
+    try:
+        identity, owner_id = request_identity(request)
+        return await _svc.bulk_create(
+            identity=identity, owner_id=owner_id, body=request, ndjson="ndjson" in (request.content_type or "")
+        )
+    except PermissionError:
+        raise HttpError(403, "Forbidden")
+    except ImportTooLarge as e:
+        raise HttpError(413, str(e))
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    except Exception as e:
+        raise HttpError(500, str(e))
+
+
+@router.get("/search", response=list[DocumentOut] | list[DocumentSummaryOut])
+async def search_documents(
+    request,
+    q: str,
+    limit: int = 10,
+    view: DocumentView = "full",
+    x_user_id: int = Header(..., alias="X-User-Id"),
+    x_tenant: str | None = Header(None, alias="X-Tenant"),
+    x_user_role: str = Header("user", alias="X-User-Role"),
+    x_user_name: str = Header("user", alias="X-User-Name"),
+):
+    try:
+        identity, owner_id = request_identity(request)
+        target_owner_id = None if x_user_role == "admin" else owner_id
+        return await _svc.search(
+            identity=identity, owner_id=target_owner_id, query=q, limit=limit, summary=view == "summary"
+        )
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except Exception as e:
@@ -75,7 +145,7 @@ def list_documents(
 
 
 @router.get("/{document_id}", response=DocumentOut)
-def get_document(
+async def get_document(
     request,
     document_id: int,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -84,9 +154,9 @@ def get_document(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
+        identity, owner_id = request_identity(request)
         target_owner_id = None if x_user_role == "admin" else owner_id
-        return _svc.get(identity=identity, owner_id=target_owner_id, document_id=document_id)
+        return await _svc.get(identity=identity, owner_id=target_owner_id, document_id=document_id)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except ObjectDoesNotExist:
@@ -96,7 +166,7 @@ def get_document(
 
 
 @router.post("/", response=DocumentOut)
-def create_document(
+async def create_document(
     request,
     payload: DocumentCreate,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -105,8 +175,8 @@ def create_document(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        return _svc.create(identity=identity, owner_id=owner_id, payload=payload)
+        identity, owner_id = request_identity(request)
+        return await _svc.create(identity=identity, owner_id=owner_id, payload=payload)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except Exception as e:
@@ -114,7 +184,7 @@ def create_document(
 
 
 @router.put("/{document_id}", response=DocumentOut)
-def update_document(
+async def update_document(
     request,
     document_id: int,
     payload: DocumentUpdate,
@@ -124,20 +194,9 @@ def update_document(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
+        identity, owner_id = request_identity(request)
         target_owner_id = None if x_user_role == "admin" else owner_id
-        
-        if not _auth.check(identity, "read", "document"):
-            raise HttpError(403, "Forbidden")
-
-        doc = _repo.get(owner_id=target_owner_id, document_id=document_id)
-        if payload.title is not None:
-            doc.title = payload.title
-        if payload.content is not None:
-            doc.content = payload.content
-        doc.save()
-
-        return DocumentOut.model_validate(doc, from_attributes=True)
+        return await _svc.update(identity=identity, owner_id=target_owner_id, document_id=document_id, payload=payload)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except ObjectDoesNotExist:
@@ -147,7 +206,7 @@ def update_document(
 
 
 @router.delete("/{document_id}")
-def delete_document(
+async def delete_document(
     request,
     document_id: int,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -156,9 +215,9 @@ def delete_document(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
+        identity, owner_id = request_identity(request)
         target_owner_id = None if x_user_role == "admin" else owner_id
-        _svc.delete(identity=identity, owner_id=target_owner_id, document_id=document_id)
+        await _svc.delete(identity=identity, owner_id=target_owner_id, document_id=document_id)
         return {"message": "success"}
     except PermissionError:
         raise HttpError(403, "Forbidden")
@@ -168,7 +227,7 @@ def delete_document(
         raise HttpError(500, str(e))
 
 @router.post("/{document_id}/request-delete", response=DocumentOut)
-def request_delete_document(
+async def request_delete_document(
     request,
     document_id: int,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -177,8 +236,8 @@ def request_delete_document(
     x_user_name: str = Header("user", alias="X-User-Name"),
 ):
     try:
-        identity, owner_id = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        return _svc.request_delete(identity=identity, owner_id=owner_id, document_id=document_id)
+        identity, owner_id = request_identity(request)
+        return await _svc.request_delete(identity=identity, owner_id=owner_id, document_id=document_id)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except ObjectDoesNotExist:
@@ -187,7 +246,7 @@ def request_delete_document(
         raise HttpError(500, str(e))
 
 @router.post("/{document_id}/undo-request-delete", response=DocumentOut)
-def undo_request_delete_document(
+async def undo_request_delete_document(
     request,
     document_id: int,
     x_user_id: int = Header(..., alias="X-User-Id"),
@@ -198,8 +257,8 @@ def undo_request_delete_document(
     try:
         if x_user_role != "admin":
             raise HttpError(403, "Forbidden")
-        identity, _ = _identity_from_headers(x_user_id, x_tenant, x_user_role, x_user_name)
-        return _svc.undo_request_delete(identity=identity, document_id=document_id)
+        identity, _ = request_identity(request)
+        return await _svc.undo_request_delete(identity=identity, document_id=document_id)
     except PermissionError:
         raise HttpError(403, "Forbidden")
     except ObjectDoesNotExist:
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from ninja import Router
+from ai.response_cache import response_cache
+from ai.router import router as agent_router
+from integrations.authorizer import decision_cache, local_engine
+from integrations.tmdb_client import detail_cache, search_cache
+
+router = Router(tags=["metrics"])
+
+
+@router.get("/")
+def metrics(request):
+    return {
+        "authorizer_decision_cache": decision_cache.stats(),
+        "authorizer_local_policy": local_engine.stats() if local_engine is not None else None,
+        "tmdb_search_cache": search_cache.stats(),
+        "tmdb_detail_cache": detail_cache.stats(),
+        "agent_router": agent_router.stats(),
+        "agent_response_cache": response_cache.stats(),
+    }
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from typing import AsyncIterator, Literal
+import orjson
+from django.http import StreamingHttpResponse
+from pydantic import BaseModel
+
+# "ndjson" writes one object per line; "json" writes a single array, still incrementally.
+ExportFormat = Literal["ndjson", "json"]
+
+_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+# Rows per write; keeps chunks a few KB to a few hundred KB instead of one tiny write per row.
+_ROWS_PER_WRITE = 100
+
+
+def _flush(buffer: list[bytes], fmt: ExportFormat, first: bool) -> bytes:
+    if fmt == "ndjson":
+        return b"\n".join(buffer) + b"\n"
+    return (b"" if first else b",") + b",".join(buffer)
+
+
+async def _encode(rows: AsyncIterator[BaseModel], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    if fmt == "json":
+        yield b"["
+    buffer: list[bytes] = []
+    first = True
+    async for row in rows:
+        buffer.append(orjson.dumps(row.model_dump()))
+        if len(buffer) >= _ROWS_PER_WRITE:
+            yield _flush(buffer, fmt, first)
+            buffer, first = [], False
+    if buffer:
+        yield _flush(buffer, fmt, first)
+    if fmt == "json":
+        yield b"]"
+
+
+def stream_rows(rows: AsyncIterator[BaseModel], fmt: ExportFormat, filename: str) -> StreamingHttpResponse:
+    """Serializes ``rows`` as they are produced, so memory stays flat however many there are."""
+    response = StreamingHttpResponse(_encode(rows, fmt), content_type=_CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,17 +1,27 @@
 from ninja import Router
 from domain.users.schemas import UserCreate, UserSchema, UserRoleUpdate, UserPasswordReset
-from services.users_service import create_user, get_all_users_with_roles, delete_user, update_user_role, reset_password
-from django.http import HttpRequest
+from services.users_service import create_user, get_all_users_with_roles, iter_users_with_roles, delete_user, update_user_role, reset_password
+from app.api.streaming import ExportFormat, stream_rows
+from django.http import HttpRequest, HttpResponse
 from typing import List
 
 router = Router(tags=["Users"])
 
 @router.get("/", response=List[UserSchema])
-def list_users_endpoint(request: HttpRequest):
+def list_users_endpoint(request: HttpRequest, response: HttpResponse, offset: int = 0, limit: int = 100):
     """
-    Lists all users.
+    Lists users, one page at a time; the total is in the X-Total-Count header.
     """
-    return get_all_users_with_roles()
+    users, total = get_all_users_with_roles(offset=max(offset, 0), limit=min(max(limit, 1), 500))
+    response["X-Total-Count"] = str(total)
+    return users
+
+@router.get("/export")
+async def export_users_endpoint(request: HttpRequest, format: ExportFormat = "ndjson"):
+    """
+    Streams every user with their role as NDJSON (default) or a JSON array.
+    """
+    return stream_rows(iter_users_with_roles(), format, "users")
 
 @router.post("/", response={201: UserSchema})
 def create_user_endpoint(request: HttpRequest, data: UserCreate):
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest
+from domain.auth.types import Identity
+from services.identity_service import resolve_identity
+
+
+class IdentityMiddleware:
+    """Resolves the X-User-* headers once per request into ``request.identity`` and ``request.owner_id``.
+
+    Requests without a valid X-User-Id pass through untouched; the API's header validation rejects them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        headers = _identity_headers(request)
+        if headers is not None:
+            _attach(request, async_to_sync(resolve_identity)(*headers), headers)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        headers = _identity_headers(request)
+        if headers is not None:
+            _attach(request, await resolve_identity(*headers), headers)
+        return await self.get_response(request)
+
+
+def _identity_headers(request: HttpRequest) -> tuple[int, str | None, str, str] | None:
+    try:
+        user_id = int(request.headers["X-User-Id"])
+    except (KeyError, ValueError):
+        return None
+    return (
+        user_id,
+        request.headers.get("X-Tenant"),
+        request.headers.get("X-User-Role", "user"),
+        request.headers.get("X-User-Name", "user"),
+    )
+
+
+def _attach(request: HttpRequest, identity: Identity, headers: tuple[int, str | None, str, str]) -> None:
+    request.identity = identity
+    request.owner_id = headers[0]
+    request.user_role = headers[2]
+
+
+def request_identity(request: HttpRequest) -> tuple[Identity, int]:
+    return request.identity, request.owner_id
@@ -19,15 +19,11 @@ from asgiref.sync import async_to_sync
 
 from integrations.permit_bootstrap import PermitBootstrapper
 from integrations.authorizer import Authorizer
-from ai import agents
-from ai.supervisors import get_supervisor
+from ai import registry, router as agent_router
+from ai.checkpointer import get_checkpointer
 from langchain_core.messages import HumanMessage
 
-try:
-    from langgraph.checkpoint.memory import MemorySaver
-    CHECKPOINTER = MemorySaver()
-except Exception:
-    CHECKPOINTER = None
+CHECKPOINTER = get_checkpointer()
 
 auth = Authorizer()
 
@@ -46,9 +42,8 @@ def ensure_user(username: str):
     return user
 
 def ensure_permit_once(user_id: int, email: str, first_name: str, role: str = "user") -> None:
-    if not st.session_state.get("permit_bootstrapped_v4"):
-        PermitBootstrapper().bootstrap()
-        st.session_state["permit_bootstrapped_v4"] = True
+    # No remote calls unless the desired Permit setup changed since it was last applied.
+    PermitBootstrapper().bootstrap()
     
     user_sync_key = f"permit_synced_{user_id}"
     if not st.session_state.get(user_sync_key):
@@ -98,16 +93,13 @@ with st.sidebar:
     else:
         agent_choice = None
 
-document_agent = agents.get_document_agent(checkpointer=CHECKPOINTER)
-movie_agent = agents.get_movie_discovery_agent(checkpointer=CHECKPOINTER)
-supervisor = get_supervisor(checkpointer=CHECKPOINTER)
-
 if mode == "Permit Diagnostics":
     from domain.auth.types import Identity
     identity = Identity(user_key=str(user.id), tenant_key=settings.PERMIT_TENANT_KEY)
-    st.write("read document:", auth.check(identity, "read", "document"))
-    st.write("create document:", auth.check(identity, "create", "document"))
-    st.write("delete document:", auth.check(identity, "delete", "document"))
+    actions = ["read", "create", "delete"]
+    decisions = auth.check_many(identity, [(action, "document") for action in actions])
+    for action, allowed in zip(actions, decisions):
+        st.write(f"{action} document:", allowed)
 
 elif mode == "Chat":
     if "chat_messages" not in st.session_state:
@@ -125,12 +117,11 @@ elif mode == "Chat":
 
         with st.chat_message("assistant"):
             tid = st.session_state["thread_id"]
-            if agent_choice == "Documents":
-                reply = invoke_agent(document_agent, user.id, prompt, tid)
-            elif agent_choice == "Movies":
-                reply = invoke_agent(movie_agent, user.id, prompt, tid)
-            else:
-                reply = invoke_agent(supervisor, user.id, prompt, tid)
+            agent_name = agent_choice or registry.SUPERVISOR
+            if settings.AGENT_FAST_ROUTE:
+                agent_name = agent_router.select(agent_name, prompt)
+            compiled_agent = registry.get_agent(agent_name, checkpointer=CHECKPOINTER)
+            reply = invoke_agent(compiled_agent, user.id, prompt, tid)
             st.markdown(reply)
             st.session_state["chat_messages"].append({"role": "assistant", "content": reply})
 
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from unittest import mock
+from domain.auth.types import Identity
+from services.identity_service import tenant_key_for
+
+
+async def stub_identity(user_id: int, tenant: str | None, role: str = "user", username: str = "user") -> Identity:
+    """Stands in for resolve_identity: the steady state, with no cache lookup, user row or Permit sync."""
+    return Identity(user_key=str(user_id), tenant_key=tenant_key_for(tenant))
+
+
+class IdentityStubMixin:
+    """TestCase mixin that resolves X-User-* headers with ``stub_identity``; ``start_patches`` adds more patches."""
+
+    def setUp(self):
+        super().setUp()
+        self.start_patches(mock.patch("app.middleware.resolve_identity", stub_identity))
+
+    def start_patches(self, *patchers) -> None:
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
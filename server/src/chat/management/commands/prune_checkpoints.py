@@ -0,0 +1,42 @@
+from __future__ import annotations
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ai.checkpointer import DjangoCheckpointSaver
+from chat.models import ChatThread, GraphCheckpoint
+
+
+class Command(BaseCommand):
+    help = "Trim and drop stored LangGraph checkpoints according to the retention policy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", type=int, default=settings.LANGGRAPH_CHECKPOINT_KEEP,
+                            help="Root checkpoints to keep per thread.")
+        parser.add_argument("--idle-days", type=int, default=None,
+                            help="Drop all checkpoints of chat threads not updated for this many days.")
+        parser.add_argument("--orphans", action="store_true",
+                            help="Drop checkpoints whose thread id has no ChatThread (e.g. Streamlit sessions).")
+
+    def handle(self, *args, **options):
+        saver = DjangoCheckpointSaver(keep=options["keep"])
+        thread_ids = set(GraphCheckpoint.objects.values_list("thread_id", flat=True).distinct())
+        dropped = set()
+
+        if options["idle_days"] is not None:
+            cutoff = timezone.now() - timedelta(days=options["idle_days"])
+            idle = ChatThread.objects.filter(uuid__in=thread_ids, updated_at__lt=cutoff).values_list("uuid", flat=True)
+            dropped.update(idle)
+
+        if options["orphans"]:
+            known = set(ChatThread.objects.filter(uuid__in=thread_ids).values_list("uuid", flat=True))
+            dropped.update(thread_ids - known)
+
+        for thread_id in dropped:
+            saver.delete_thread(thread_id)
+
+        trimmed = 0
+        for thread_id in thread_ids - dropped:
+            trimmed += saver.prune(thread_id)
+
+        self.stdout.write(f"Dropped {len(dropped)} thread(s), trimmed {trimmed} checkpoint(s).")
@@ -17,7 +17,60 @@ class ChatMessage(models.Model):
     thread = models.ForeignKey(ChatThread, on_delete=models.CASCADE, related_name="messages")
     role = models.CharField(max_length=50)
     content = models.TextField()
+    # Agent that handled the turn, and (on user messages) the graph checkpoint the turn started from.
+    agent = models.CharField(max_length=50, blank=True, default="")
+    checkpoint_id = models.CharField(max_length=64, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the newest-first history pages as a backward index scan.
+            models.Index(fields=["thread", "created_at", "id"], name="chat_message_thread_idx"),
+        ]
+
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
+
+class GraphCheckpoint(models.Model):
+    # LangGraph thread id, i.e. ChatThread.uuid for API conversations.
+    thread_id = models.CharField(max_length=100)
+    checkpoint_ns = models.CharField(max_length=255, default="", blank=True)
+    checkpoint_id = models.CharField(max_length=64)
+    parent_checkpoint_id = models.CharField(max_length=64, null=True, blank=True)
+    checkpoint_type = models.CharField(max_length=32)
+    checkpoint = models.BinaryField()
+    metadata_type = models.CharField(max_length=32)
+    metadata = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["thread_id", "checkpoint_ns", "checkpoint_id"], name="chat_graphcheckpoint_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.thread_id}:{self.checkpoint_ns}:{self.checkpoint_id}"
+
+class GraphCheckpointWrite(models.Model):
+    thread_id = models.CharField(max_length=100)
+    checkpoint_ns = models.CharField(max_length=255, default="", blank=True)
+    checkpoint_id = models.CharField(max_length=64)
+    task_id = models.CharField(max_length=64)
+    task_path = models.CharField(max_length=255, default="", blank=True)
+    idx = models.IntegerField()
+    channel = models.CharField(max_length=255)
+    value_type = models.CharField(max_length=32)
+    value = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"],
+                name="chat_graphcheckpointwrite_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.thread_id}:{self.checkpoint_id}:{self.task_id}:{self.idx}"
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from langchain_core.messages import AIMessage
+from ai import registry, response_cache
+from app.api import chat as chat_api
+from app.testing import IdentityStubMixin
+from chat.models import ChatMessage, ChatThread
+from integrations.cache import TTLCache
+
+User = get_user_model()
+
+USER_ID = 1
+OTHER_ID = 2
+TENANT = "default"
+QUESTION = "When was it released?"
+
+
+class ResponseCacheTests(IdentityStubMixin, TestCase):
+    """The answer cache only serves context-free turns, the same ones it stores answers from."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=USER_ID, username="user")
+
+    def setUp(self):
+        super().setUp()
+        self.agent = mock.Mock()
+        self.agent.ainvoke = mock.AsyncMock(return_value={"messages": [AIMessage(content="fresh answer")]})
+        self.agent.aupdate_state = mock.AsyncMock()
+        self.start_patches(
+            mock.patch.object(chat_api, "_select_agent", lambda name: self.agent),
+            mock.patch.object(response_cache, "response_cache", TTLCache(maxsize=8, ttl=60)),
+        )
+        response_cache.store(registry.MOVIES, TENANT, QUESTION, ["search_movies"], "cached answer")
+
+    def _send(self, thread_id: str | None = None):
+        payload = {"message": QUESTION, "agent": registry.MOVIES, "user_id": USER_ID, "tenant": TENANT}
+        if thread_id is not None:
+            payload["thread_id"] = thread_id
+        response = self.client.post(
+            "/api/chat/", payload, content_type="application/json", headers={"X-User-Id": str(USER_ID)}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_new_thread_reuses_cached_answer(self):
+        body = self._send()
+
+        self.assertEqual(body["response"], "cached answer")
+        self.agent.ainvoke.assert_not_called()
+        self.agent.aupdate_state.assert_awaited_once()
+
+    def test_follow_up_turn_misses_cache(self):
+        with mock.patch.object(chat_api, "_head_checkpoint", mock.AsyncMock(return_value="1f0-earlier-turn")):
+            body = self._send(thread_id="existing-thread")
+
+        self.assertEqual(body["response"], "fresh answer")
+        self.agent.ainvoke.assert_awaited_once()
+        self.agent.aupdate_state.assert_not_called()
+        self.assertEqual(
+            list(ChatMessage.objects.filter(thread__uuid="existing-thread").values_list("content", flat=True)),
+            [QUESTION, "fresh answer"],
+        )
+
+
+class ThreadOwnershipTests(IdentityStubMixin, TestCase):
+    """A client-supplied thread_id is only continued by its owner; the checkpointer itself is keyed by uuid alone."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=USER_ID, username="user")
+        other = User.objects.create(id=OTHER_ID, username="other")
+        ChatThread.objects.create(owner=other, title="Theirs", uuid="their-thread")
+
+    def setUp(self):
+        super().setUp()
+        self.agent = mock.Mock()
+        self.head_checkpoint = mock.AsyncMock(return_value="1f0-their-turn")
+        self.start_patches(
+            mock.patch.object(chat_api, "_select_agent", lambda name: self.agent),
+            mock.patch.object(chat_api, "_head_checkpoint", self.head_checkpoint),
+        )
+
+    def test_other_owners_thread_is_not_found(self):
+        payload = {"message": QUESTION, "thread_id": "their-thread", "agent": registry.MOVIES, "user_id": USER_ID}
+        for path in ("/api/chat/", "/api/chat/stream"):
+            with self.subTest(path=path):
+                response = self.client.post(
+                    path, payload, content_type="application/json", headers={"X-User-Id": str(USER_ID)}
+                )
+                self.assertEqual(response.status_code, 404)
+
+        self.head_checkpoint.assert_not_called()
+        self.assertEqual(self.agent.mock_calls, [])
+        self.assertFalse(ChatMessage.objects.filter(thread__uuid="their-thread").exists())
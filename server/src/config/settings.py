@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "documents",
     "chat",
+    "accounts",
 ]
 
 MIDDLEWARE = [
@@ -44,6 +45,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.middleware.IdentityMiddleware",
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True 
@@ -62,6 +64,7 @@ CORS_ALLOW_HEADERS = [
     "x-user-role",
     "x-user-name",
 ]
+CORS_EXPOSE_HEADERS = ["x-next-cursor", "x-total-count"]
 
 ROOT_URLCONF = "config.urls"
 
@@ -119,6 +122,13 @@ else:
         }
     }
 
+# Shared across workers when REDIS_URL is set (needs the redis package); per-process otherwise.
+REDIS_URL = config("REDIS_URL", default=None)
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -146,9 +156,52 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 OPENAI_API_KEY = config("OPENAI_API_KEY", default=None)
 TMDB_API_KEY = config("TMDB_API_KEY", default=None)
 TMDB_ACCESS_TOKEN = config("TMDB_ACCESS_TOKEN", default=None)
+TMDB_SEARCH_CACHE_TTL = config("TMDB_SEARCH_CACHE_TTL", default=600, cast=float)
+TMDB_DETAIL_CACHE_TTL = config("TMDB_DETAIL_CACHE_TTL", default=86400, cast=float)
+# Expired entries are still served for this long while a background refresh runs.
+TMDB_CACHE_STALE_TTL = config("TMDB_CACHE_STALE_TTL", default=3600, cast=float)
+TMDB_CACHE_SIZE = config("TMDB_CACHE_SIZE", default=2048, cast=int)
+TMDB_POOL_SIZE = config("TMDB_POOL_SIZE", default=20, cast=int)
+TMDB_FANOUT_WORKERS = config("TMDB_FANOUT_WORKERS", default=8, cast=int)
+TMDB_DETAIL_TIMEOUT = config("TMDB_DETAIL_TIMEOUT", default=10, cast=float)
 
 PERMIT_API_KEY = config("PERMIT_API_KEY", default=None)
 PERMIT_PDP_URL = config("PERMIT_PDP_URL", default="https://cloudpdp.api.permit.io")
 PERMIT_TENANT_KEY = config("PERMIT_TENANT_KEY", default="default")
 PERMIT_ADMIN_ROLE_KEY = config("PERMIT_ADMIN_ROLE_KEY", default="admin")
-PERMIT_USER_ROLE_KEY = config("PERMIT_USER_ROLE_KEY", default="user")
\ No newline at end of file
+PERMIT_USER_ROLE_KEY = config("PERMIT_USER_ROLE_KEY", default="user")
+PERMIT_DECISION_CACHE_TTL = config("PERMIT_DECISION_CACHE_TTL", default=30, cast=float)
+PERMIT_DECISION_CACHE_SIZE = config("PERMIT_DECISION_CACHE_SIZE", default=4096, cast=int)
+PERMIT_ROLE_CACHE_TTL = config("PERMIT_ROLE_CACHE_TTL", default=60, cast=float)
+IDENTITY_CACHE_TTL = config("IDENTITY_CACHE_TTL", default=300, cast=int)
+# Rows fetched per database round trip by the streaming /export endpoints.
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=500, cast=int)
+# POST /api/documents/bulk: rows per INSERT transaction, and the most rows and bytes one request may carry.
+# The body is read as a stream, so DATA_UPLOAD_MAX_MEMORY_SIZE doesn't apply; this byte cap does.
+DOCUMENT_IMPORT_CHUNK_SIZE = config("DOCUMENT_IMPORT_CHUNK_SIZE", default=500, cast=int)
+DOCUMENT_IMPORT_MAX_ROWS = config("DOCUMENT_IMPORT_MAX_ROWS", default=10000, cast=int)
+DOCUMENT_IMPORT_MAX_BYTES = config("DOCUMENT_IMPORT_MAX_BYTES", default=50 * 1024 * 1024, cast=int)
+# "permit" asks the PDP; "local" evaluates the bootstrap role permissions in-process.
+AUTHZ_BACKEND = config("AUTHZ_BACKEND", default="permit")
+AUTHZ_LOCAL_REFRESH_SECONDS = config("AUTHZ_LOCAL_REFRESH_SECONDS", default=30, cast=float)
+# Permit writes go through accounts.PermitOutbox; `manage.py drain_permit_outbox` is the durable worker.
+PERMIT_OUTBOX_BATCH_SIZE = config("PERMIT_OUTBOX_BATCH_SIZE", default=100, cast=int)
+PERMIT_OUTBOX_MAX_ATTEMPTS = config("PERMIT_OUTBOX_MAX_ATTEMPTS", default=8, cast=int)
+PERMIT_OUTBOX_BACKOFF_SECONDS = config("PERMIT_OUTBOX_BACKOFF_SECONDS", default=5, cast=float)
+# Also drain freshly queued entries on a background thread in the web process.
+PERMIT_OUTBOX_KICK = config("PERMIT_OUTBOX_KICK", default=True, cast=bool)
+
+# "database" (shared across workers, survives restarts) or "memory" (per process).
+LANGGRAPH_CHECKPOINTER = config("LANGGRAPH_CHECKPOINTER", default="database")
+LANGGRAPH_CHECKPOINT_KEEP = config("LANGGRAPH_CHECKPOINT_KEEP", default=50, cast=int)
+# Agents see the last N turns verbatim plus a rolling summary of the rest (0 sends the full history).
+# Older turns are folded into the summary once SUMMARY_BATCH extra turns have accumulated.
+LANGGRAPH_HISTORY_TURNS = config("LANGGRAPH_HISTORY_TURNS", default=12, cast=int)
+LANGGRAPH_SUMMARY_BATCH = config("LANGGRAPH_SUMMARY_BATCH", default=6, cast=int)
+LANGGRAPH_SUMMARY_WORDS = config("LANGGRAPH_SUMMARY_WORDS", default=250, cast=int)
+# Send clearly single-domain Supervisor requests straight to the specialist (see ai/router.py).
+AGENT_FAST_ROUTE = config("AGENT_FAST_ROUTE", default=True, cast=bool)
+# Opt-in cache of answers to repeatable movie questions (see ai/response_cache.py).
+AGENT_RESPONSE_CACHE = config("AGENT_RESPONSE_CACHE", default=False, cast=bool)
+AGENT_RESPONSE_CACHE_TTL = config("AGENT_RESPONSE_CACHE_TTL", default=3600, cast=float)
+AGENT_RESPONSE_CACHE_SIZE = config("AGENT_RESPONSE_CACHE_SIZE", default=1024, cast=int)
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# The search index lives outside the ORM model so each backend can use its native engine:
+# a generated tsvector column with a GIN index on PostgreSQL, an FTS5 table on SQLite.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE documents_document ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX documents_document_search_idx ON documents_document USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS documents_document_search_idx",
+    "ALTER TABLE documents_document DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE documents_document_fts USING fts5(
+        title, content, content='documents_document', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER documents_document_fts_ai AFTER INSERT ON documents_document BEGIN
+        INSERT INTO documents_document_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER documents_document_fts_ad AFTER DELETE ON documents_document BEGIN
+        INSERT INTO documents_document_fts(documents_document_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER documents_document_fts_au AFTER UPDATE OF title, content ON documents_document BEGIN
+        INSERT INTO documents_document_fts(documents_document_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO documents_document_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO documents_document_fts(documents_document_fts) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS documents_document_fts_au",
+    "DROP TRIGGER IF EXISTS documents_document_fts_ad",
+    "DROP TRIGGER IF EXISTS documents_document_fts_ai",
+    "DROP TABLE IF EXISTS documents_document_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_delete_requested'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+    ]
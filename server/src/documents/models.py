@@ -16,6 +16,21 @@ class Document(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination over live documents, per owner and across owners (admins).
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                condition=models.Q(is_deleted=False),
+                name="documents_owner_recent_idx",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_deleted=False),
+                name="documents_recent_idx",
+            ),
+        ]
+
     def soft_delete(self) -> None:
         self.is_deleted = True
         self.deleted_at = timezone.now()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from app.api import documents as documents_api
+from app.testing import IdentityStubMixin
+from documents.models import Document
+from repositories.documents_repo import DocumentsRepository
+
+User = get_user_model()
+
+ADMIN_ID = 1
+
+
+class DocumentQueryCountTests(IdentityStubMixin, TestCase):
+    """Query budgets for the documents endpoints, with identity and authorization already warm.
+
+    A regression here usually means a serializer started lazy-loading a relation per row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(id=ADMIN_ID, username="admin", is_staff=True)
+        owners = [User.objects.create(username=f"owner{i}") for i in range(5)]
+        Document.objects.bulk_create(
+            [Document(owner=owners[i % len(owners)], title=f"Budget {i}", content=f"quarterly budget {i}") for i in range(30)]
+        )
+
+    def setUp(self):
+        # Steady state: the identity cache and the authorization decision are both hits.
+        super().setUp()
+        self.start_patches(mock.patch.object(documents_api._auth, "check", mock.AsyncMock(return_value=True)))
+
+    def _headers(self) -> dict:
+        return {"X-User-Id": str(ADMIN_ID), "X-User-Role": "admin", "X-User-Name": "admin"}
+
+    def test_admin_list_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/documents/", {"limit": 25}, headers=self._headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 25)
+        self.assertEqual(len({d["owner_username"] for d in response.json()}), 5)
+
+    def test_search_is_two_queries(self):
+        # One ranked id lookup in the full-text index, one load of those documents with their owners.
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/documents/search", {"q": "budget", "limit": 25}, headers=self._headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 25)
+
+    def test_create_is_two_queries(self):
+        # The insert, then the new row read back with its owner joined.
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/api/documents/",
+                {"title": "Roadmap", "content": "next quarter"},
+                content_type="application/json",
+                headers=self._headers(),
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["owner_username"], "admin")
+
+    def test_created_document_has_owner_loaded(self):
+        doc = DocumentsRepository().create(owner_id=ADMIN_ID, title="Roadmap", content=None)
+        with self.assertNumQueries(0):
+            self.assertEqual(doc.owner_username, "admin")
@@ -8,11 +8,16 @@ class ChatThreadOut(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class ChatThreadExportOut(ChatThreadOut):
+    # Admin exports span every owner.
+    owner_id: int
+
 class ChatMessageOut(BaseModel):
     id: int
     role: str
     content: str
     thread_id: int
+    agent: str = ""
     created_at: datetime
 
 class ChatThreadUpdate(BaseModel):
@@ -19,3 +19,27 @@ class DocumentOut(BaseModel):
     delete_requested: bool = False
     created_at: datetime
     updated_at: datetime
+
+class DocumentSummaryOut(BaseModel):
+    id: int
+    title: str
+    owner_username: str
+    status: str
+    delete_requested: bool = False
+    created_at: datetime
+    updated_at: datetime
+
+class DocumentImportError(BaseModel):
+    index: int
+    error: str
+
+class DocumentImportOut(BaseModel):
+    created: int
+    ids: list[int]
+    errors: list[DocumentImportError]
+
+class DocumentPermissionsOut(BaseModel):
+    read: bool
+    create: bool
+    update: bool
+    delete: bool
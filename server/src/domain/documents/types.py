@@ -1,4 +1,5 @@
 from __future__ import annotations
+import base64
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -10,3 +11,23 @@ class DocumentRecord:
     content: str | None
     created_at: datetime
     updated_at: datetime
+
+
+@dataclass(frozen=True)
+class DocumentCursor:
+    """Keyset position (created_at, id) of the last document on a page, opaque to clients."""
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> DocumentCursor:
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            created_at, id_ = raw.rsplit("|", 1)
+            return cls(created_at=datetime.fromisoformat(created_at), id=int(id_))
+        except Exception:
+            raise ValueError("Invalid cursor")
@@ -1,63 +1,270 @@
 from __future__ import annotations
-from asgiref.sync import async_to_sync
+import asyncio
+from typing import Sequence
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from permit.api.models import RoleAssignmentCreate, RoleAssignmentRemove, UserCreate
+from permit.exceptions import PermitAlreadyExistsError, PermitNotFoundError
 from domain.auth.types import Identity
+from integrations.cache import TTLCache
+from integrations.local_policy import LocalPolicyEngine, load_user_roles
 from integrations.permit_client import permit_client, permit_config
 
-class Authorizer:
-    def sync_user(self, user_key: str, email: str, first_name: str) -> None:
-        async def _sync():
-            await permit_client.api.users.sync({"key": user_key, "email": email, "first_name": first_name})
-        async_to_sync(_sync)()
+# Per-process cache of PDP decisions keyed on (user_key, tenant_key, action, resource).
+decision_cache = TTLCache(
+    maxsize=settings.PERMIT_DECISION_CACHE_SIZE,
+    ttl=settings.PERMIT_DECISION_CACHE_TTL,
+)
 
-    def assign_admin(self, user_key: str) -> None:
-        async def _assign():
-            try:
-                await permit_client.api.users.unassign_role(
-                    {
-                        "user": user_key,
-                        "role": permit_config.user_role_key,
-                        "tenant": permit_config.tenant_key,
-                    }
-                )
-            except Exception:
-                pass
+# Per-process cache of each user's assigned role keys in the configured tenant.
+role_cache = TTLCache(
+    maxsize=settings.PERMIT_DECISION_CACHE_SIZE,
+    ttl=settings.PERMIT_ROLE_CACHE_TTL,
+)
 
-            await permit_client.api.users.assign_role(
+# AUTHZ_BACKEND=local answers checks in-process from the bootstrap policy instead of asking the PDP.
+local_engine = (
+    LocalPolicyEngine(refresh_seconds=settings.AUTHZ_LOCAL_REFRESH_SECONDS)
+    if settings.AUTHZ_BACKEND == "local"
+    else None
+)
+
+# Keys per role-assignments list call; keeps the query string well under URL limits.
+_ROLE_LOOKUP_CHUNK = 100
+
+
+def _decision_key(identity: Identity, action: str, resource: str) -> tuple[str, str, str, str]:
+    return (identity.user_key, identity.tenant_key, action, resource)
+
+
+def _cached_decisions(identity: Identity, checks: Sequence[tuple[str, str]]) -> list[bool | None]:
+    return [decision_cache.get(_decision_key(identity, action, resource)) for action, resource in checks]
+
+
+def _local_decisions(identity: Identity, checks: Sequence[tuple[str, str]]) -> list[bool | None]:
+    return [local_engine.decide(identity.user_key, action, resource) for action, resource in checks]
+
+
+class AsyncAuthorizer:
+    """Awaits the Permit SDK directly; use from async views and the agent event loop."""
+
+    async def sync_user(self, user_key: str, email: str, first_name: str) -> None:
+        await permit_client.api.users.sync({"key": user_key, "email": email, "first_name": first_name})
+
+    async def assign_admin(self, user_key: str) -> None:
+        await self._assign_role(user_key, permit_config.admin_role_key, previous=permit_config.user_role_key)
+
+    async def assign_user(self, user_key: str) -> None:
+        await self._assign_role(user_key, permit_config.user_role_key, previous=permit_config.admin_role_key)
+
+    async def _assign_role(self, user_key: str, role: str, previous: str) -> None:
+        try:
+            await permit_client.api.users.unassign_role(
                 {
                     "user": user_key,
-                    "role": permit_config.admin_role_key,
+                    "role": previous,
                     "tenant": permit_config.tenant_key,
                 }
             )
-        async_to_sync(_assign)()
-
-    def assign_user(self, user_key: str) -> None:
-        async def _assign():
-            try:
-                await permit_client.api.users.unassign_role(
-                    {
-                        "user": user_key,
-                        "role": permit_config.admin_role_key,
-                        "tenant": permit_config.tenant_key,
-                    }
-                )
-            except Exception:
-                pass
+        except Exception:
+            pass
 
+        try:
             await permit_client.api.users.assign_role(
                 {
                     "user": user_key,
-                    "role": permit_config.user_role_key,
+                    "role": role,
                     "tenant": permit_config.tenant_key,
                 }
             )
-        async_to_sync(_assign)()
+        finally:
+            self.invalidate_user(user_key)
 
-    def check(self, identity: Identity, action: str, resource: str) -> bool:
-        async def _check():
-            return await permit_client.check(identity.user_key, action, resource)
+    async def sync_users(self, users: Sequence[dict]) -> None:
+        """Upsert many users at once; each dict has ``key``, ``email`` and ``first_name``."""
+        await permit_client.api.users.bulk_replace([UserCreate(**u) for u in users])
+
+    async def assign_roles(self, assignments: Sequence[tuple[str, str, str]]) -> None:
+        """Apply many ``(user_key, role, previous_role)`` changes with one unassign and one assign call."""
+        tenant = permit_config.tenant_key
+        try:
+            await permit_client.api.role_assignments.bulk_unassign(
+                [RoleAssignmentRemove(user=u, role=previous, tenant=tenant) for u, _, previous in assignments]
+            )
+        except Exception:
+            pass
+        try:
+            await permit_client.api.role_assignments.bulk_assign(
+                [RoleAssignmentCreate(user=u, role=role, tenant=tenant) for u, role, _ in assignments]
+            )
+        finally:
+            for user_key, _, _ in assignments:
+                self.invalidate_user(user_key)
+
+    async def assign_role(self, user_key: str, role: str, previous: str) -> None:
+        try:
+            await self._assign_role(user_key, role, previous=previous)
+        except PermitAlreadyExistsError:
+            pass
+
+    async def delete_users(self, user_keys: Sequence[str]) -> None:
+        try:
+            await permit_client.api.users.bulk_delete(list(user_keys))
+        finally:
+            for user_key in user_keys:
+                self.invalidate_user(user_key)
+
+    async def delete_user(self, user_key: str) -> None:
+        try:
+            await permit_client.api.users.delete(user_key)
+        except PermitNotFoundError:
+            pass
+        finally:
+            self.invalidate_user(user_key)
+
+    async def check(self, identity: Identity, action: str, resource: str) -> bool:
+        if local_engine is not None:
+            return (await self._check_many_local(identity, [(action, resource)]))[0]
+        cached = decision_cache.get(_decision_key(identity, action, resource))
+        if cached is not None:
+            return cached
+        return await self._check_remote(identity, action, resource)
+
+    async def _check_remote(self, identity: Identity, action: str, resource: str) -> bool:
+        try:
+            allowed = bool(await permit_client.check(identity.user_key, action, resource))
+        except Exception:
+            return False
+        decision_cache.set(_decision_key(identity, action, resource), allowed)
+        return allowed
+
+    async def check_many(self, identity: Identity, checks: Sequence[tuple[str, str]]) -> list[bool]:
+        if local_engine is not None:
+            return await self._check_many_local(identity, checks)
+        decisions = _cached_decisions(identity, checks)
+        if None not in decisions:
+            return list(decisions)
+        return await self._check_many_remote(identity, checks, decisions)
 
+    async def _check_many_remote(
+        self,
+        identity: Identity,
+        checks: Sequence[tuple[str, str]],
+        decisions: list[bool | None],
+    ) -> list[bool]:
+        pending = [i for i, allowed in enumerate(decisions) if allowed is None]
         try:
-            return bool(async_to_sync(_check)())
+            results = await permit_client.bulk_check(
+                [
+                    {"user": identity.user_key, "action": checks[i][0], "resource": checks[i][1]}
+                    for i in pending
+                ]
+            )
         except Exception:
-            return False
\ No newline at end of file
+            results = None
+
+        for n, i in enumerate(pending):
+            if results is None or n >= len(results):
+                decisions[i] = False
+                continue
+            decisions[i] = bool(results[n])
+            action, resource = checks[i]
+            decision_cache.set(_decision_key(identity, action, resource), decisions[i])
+        return list(decisions)
+
+    async def _check_many_local(self, identity: Identity, checks: Sequence[tuple[str, str]]) -> list[bool]:
+        decisions = _local_decisions(identity, checks)
+        if None in decisions:
+            await sync_to_async(local_engine.load_user)(identity.user_key)
+            decisions = _local_decisions(identity, checks)
+        return [bool(allowed) for allowed in decisions]
+
+    async def roles_for(self, user_keys: Sequence[str]) -> dict[str, list[str]]:
+        """Role keys assigned to each user, from the cache or one list call per chunk of uncached users."""
+        if local_engine is not None:
+            found = await sync_to_async(load_user_roles)(list(user_keys))
+            return {user_key: sorted(found.get(user_key, ())) for user_key in user_keys}
+        roles: dict[str, list[str]] = {}
+        missing: list[str] = []
+        for user_key in dict.fromkeys(user_keys):
+            cached = role_cache.get(user_key)
+            if cached is None:
+                missing.append(user_key)
+            else:
+                roles[user_key] = cached
+        chunks = [missing[i : i + _ROLE_LOOKUP_CHUNK] for i in range(0, len(missing), _ROLE_LOOKUP_CHUNK)]
+        for fetched in await asyncio.gather(*(self._list_roles(chunk) for chunk in chunks)):
+            for user_key, assigned in fetched.items():
+                role_cache.set(user_key, assigned)
+            roles.update(fetched)
+        return roles
+
+    async def _list_roles(self, user_keys: list[str]) -> dict[str, list[str]]:
+        found: dict[str, list[str]] = {user_key: [] for user_key in user_keys}
+        page, per_page = 1, 100
+        while True:
+            assignments = await permit_client.api.role_assignments.list(
+                user_key=user_keys, tenant_key=permit_config.tenant_key, page=page, per_page=per_page
+            )
+            for assignment in assignments:
+                found.setdefault(assignment.user, []).append(assignment.role)
+            if len(assignments) < per_page:
+                return found
+            page += 1
+
+    def invalidate_user(self, user_key: str) -> None:
+        decision_cache.invalidate(lambda key: key[0] == user_key)
+        role_cache.invalidate(lambda key: key == user_key)
+        if local_engine is not None:
+            local_engine.forget(user_key)
+
+    def cache_stats(self) -> dict:
+        if local_engine is not None:
+            return local_engine.stats()
+        return decision_cache.stats()
+
+
+class Authorizer:
+    """Blocking facade over AsyncAuthorizer for sync callers."""
+
+    def __init__(self) -> None:
+        self._async = AsyncAuthorizer()
+
+    def sync_user(self, user_key: str, email: str, first_name: str) -> None:
+        async_to_sync(self._async.sync_user)(user_key=user_key, email=email, first_name=first_name)
+
+    def assign_admin(self, user_key: str) -> None:
+        async_to_sync(self._async.assign_admin)(user_key=user_key)
+
+    def assign_user(self, user_key: str) -> None:
+        async_to_sync(self._async.assign_user)(user_key=user_key)
+
+    def check(self, identity: Identity, action: str, resource: str) -> bool:
+        if local_engine is not None:
+            return self.check_many(identity, [(action, resource)])[0]
+        # Cache hits never cross the sync/async bridge.
+        cached = decision_cache.get(_decision_key(identity, action, resource))
+        if cached is not None:
+            return cached
+        return async_to_sync(self._async._check_remote)(identity, action, resource)
+
+    def check_many(self, identity: Identity, checks: Sequence[tuple[str, str]]) -> list[bool]:
+        if local_engine is not None:
+            decisions = _local_decisions(identity, checks)
+            if None in decisions:
+                local_engine.load_user(identity.user_key)
+                decisions = _local_decisions(identity, checks)
+            return [bool(allowed) for allowed in decisions]
+        decisions = _cached_decisions(identity, checks)
+        if None not in decisions:
+            return list(decisions)
+        return async_to_sync(self._async._check_many_remote)(identity, checks, decisions)
+
+    def roles_for(self, user_keys: Sequence[str]) -> dict[str, list[str]]:
+        return async_to_sync(self._async.roles_for)(user_keys)
+
+    def invalidate_user(self, user_key: str) -> None:
+        self._async.invalidate_user(user_key)
+
+    def cache_stats(self) -> dict:
+        return self._async.cache_stats()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ``ttl`` seconds after being set.
+
+    With ``stale_ttl`` an expired entry is kept that much longer so ``peek`` can serve it
+    while the caller revalidates.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0) -> None:
+        self.maxsize = max(int(maxsize), 0)
+        self.ttl = float(ttl)
+        self.stale_ttl = max(float(stale_ttl), 0.0)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found = self.peek(key, allow_stale=False)
+        return default if found is None else found[0]
+
+    def peek(self, key: Hashable, allow_stale: bool = True) -> tuple[Any, bool] | None:
+        """Return ``(value, is_stale)`` or None; stale values are only returned inside the stale window."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] + self.stale_ttl <= now:
+                del self._data[key]
+                entry = None
+            if entry is None or (entry[0] <= now and not allow_stale):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if entry[0] <= now:
+                self.stale_hits += 1
+                return entry[1], True
+            self.hits += 1
+            return entry[1], False
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            stale = [k for k in self._data if predicate(k)]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": ((self.hits + self.stale_hits) / lookups) if lookups else 0.0,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+        }
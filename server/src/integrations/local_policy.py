@@ -0,0 +1,161 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Mapping
+from django.contrib.auth import get_user_model
+from django.db.models import CharField, OuterRef, Subquery
+from django.db.models.functions import Cast
+from accounts.models import PermitOutbox
+from integrations.permit_bootstrap import desired_state
+from integrations.permit_client import permit_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    role_permissions: dict[str, frozenset[str]]
+    user_permissions: dict[str, frozenset[str]] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def _permit_role(local_role: str) -> str:
+    return permit_config.admin_role_key if local_role == "admin" else permit_config.user_role_key
+
+
+def load_role_permissions() -> dict[str, frozenset[str]]:
+    """The same role -> permission model PermitBootstrapper applies to Permit."""
+    return {role: frozenset(perms) for role, perms in desired_state()["role_permissions"].items()}
+
+
+def load_user_roles(user_keys: Iterable[str] | None = None) -> dict[str, set[str]]:
+    """Role keys per user: the newest queued or applied role change, the role synced to Permit, or the admin flags.
+
+    Queued changes count so local decisions don't wait on the outbox reaching Permit.
+    """
+    User = get_user_model()
+    latest = (
+        PermitOutbox.objects.filter(
+            op=PermitOutbox.ASSIGN_ROLE,
+            user_key=Cast(OuterRef("id"), CharField()),
+            status__in=[PermitOutbox.PENDING, PermitOutbox.DONE],
+        )
+        .order_by("-id")
+        .values("payload__local_role")[:1]
+    )
+    qs = User.objects.annotate(queued_role=Subquery(latest)).select_related("permit_sync")
+    qs = qs.only("id", "is_staff", "is_superuser", "permit_sync__role")
+    if user_keys is not None:
+        qs = qs.filter(id__in=[int(k) for k in user_keys if k.isdigit()])
+    roles: dict[str, set[str]] = {}
+    for user in qs:
+        synced = getattr(user, "permit_sync", None)
+        local_role = user.queued_role or (synced.role if synced else None)
+        if local_role is None:
+            local_role = "admin" if user.is_staff or user.is_superuser else "user"
+        roles[str(user.id)] = {_permit_role(local_role)}
+    return roles
+
+
+class LocalPolicyEngine:
+    """Evaluates document permissions in-process from a periodically refreshed snapshot.
+
+    ``decide`` is a couple of dict lookups and never blocks: a stale snapshot keeps serving while a
+    background thread reloads it. Users missing from the snapshot return None so the caller can
+    ``load_user`` them (a DB read) and ask again.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float,
+        role_loader: Callable[[], Mapping[str, frozenset[str]]] = load_role_permissions,
+        user_loader: Callable[[Iterable[str] | None], Mapping[str, Iterable[str]]] = load_user_roles,
+    ) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._role_loader = role_loader
+        self._user_loader = user_loader
+        self._snapshot: PolicySnapshot | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.decisions = 0
+        self.user_loads = 0
+        self.refreshes = 0
+
+    def decide(self, user_key: str, action: str, resource: str) -> bool | None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if time.monotonic() - snapshot.loaded_at > self.refresh_seconds:
+            self._refresh_in_background()
+        perms = snapshot.user_permissions.get(user_key)
+        if perms is None:
+            return None
+        self.decisions += 1
+        return f"{resource}:{action}" in perms
+
+    def refresh(self) -> None:
+        role_permissions = {role: frozenset(perms) for role, perms in self._role_loader().items()}
+        users = self._user_loader(None)
+        self._snapshot = PolicySnapshot(
+            role_permissions=role_permissions,
+            user_permissions={key: self._expand(role_permissions, roles) for key, roles in users.items()},
+        )
+        self.refreshes += 1
+
+    def load_user(self, user_key: str) -> None:
+        if self._snapshot is None:
+            self.refresh()
+        snapshot = self._snapshot
+        roles = self._user_loader([user_key]).get(user_key, ())
+        # Copy-on-write so concurrent readers always see a complete mapping; unknown users cache as no access.
+        user_permissions = dict(snapshot.user_permissions)
+        user_permissions[user_key] = self._expand(snapshot.role_permissions, roles)
+        self._snapshot = PolicySnapshot(snapshot.role_permissions, user_permissions, snapshot.loaded_at)
+        self.user_loads += 1
+
+    def forget(self, user_key: str) -> None:
+        snapshot = self._snapshot
+        if snapshot is None or user_key not in snapshot.user_permissions:
+            return
+        user_permissions = dict(snapshot.user_permissions)
+        user_permissions.pop(user_key, None)
+        self._snapshot = PolicySnapshot(snapshot.role_permissions, user_permissions, snapshot.loaded_at)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "decisions": self.decisions,
+            "user_loads": self.user_loads,
+            "refreshes": self.refreshes,
+            "users": len(snapshot.user_permissions) if snapshot else 0,
+            "age_seconds": (time.monotonic() - snapshot.loaded_at) if snapshot else None,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+    @staticmethod
+    def _expand(role_permissions: Mapping[str, frozenset[str]], roles: Iterable[str]) -> frozenset[str]:
+        perms: set[str] = set()
+        for role in roles:
+            perms |= role_permissions.get(role, frozenset())
+        return frozenset(perms)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run() -> None:
+            from django.db import close_old_connections
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Local policy refresh failed; serving the previous snapshot")
+            finally:
+                close_old_connections()
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="local-policy-refresh", daemon=True).start()
@@ -1,76 +1,102 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable
 from asgiref.sync import async_to_sync
+from permit.exceptions import PermitAlreadyExistsError
+from accounts.models import PermitBootstrap
 from integrations.permit_client import permit_client, permit_config
 
+logger = logging.getLogger(__name__)
+
+_DOCUMENT_ACTIONS = ["create", "read", "update", "delete"]
+
+
+def desired_state() -> dict[str, Any]:
+    """Everything bootstrap creates in Permit; any change here changes the fingerprint."""
+    return {
+        "tenant": {"key": permit_config.tenant_key, "name": permit_config.tenant_key},
+        "resources": [
+            {
+                "key": "document",
+                "name": "Document",
+                "actions": {action: {"name": action} for action in _DOCUMENT_ACTIONS},
+            }
+        ],
+        "roles": [
+            {"key": permit_config.admin_role_key, "name": "Admin"},
+            {"key": permit_config.user_role_key, "name": "User"},
+        ],
+        "role_permissions": {
+            permit_config.admin_role_key: [f"document:{action}" for action in _DOCUMENT_ACTIONS],
+            permit_config.user_role_key: ["document:create", "document:read"],
+        },
+    }
+
+
+def fingerprint(state: dict[str, Any] | None = None) -> str:
+    state = desired_state() if state is None else state
+    # Scope to the Permit environment behind the API key without storing the key itself.
+    environment = hashlib.sha256(permit_config.api_key.encode()).hexdigest()
+    raw = json.dumps({"environment": environment, "state": state}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
 class PermitBootstrapper:
-    def bootstrap(self) -> None:
-        self._ensure_tenant()
-        self._ensure_resource_document()
-        self._ensure_role_admin()
-        self._ensure_role_user()
-        self._ensure_policy_admin_document_full_access()
-        self._ensure_policy_user_document_access()
+    """Creates the tenant, resource, roles and role permissions the app relies on.
 
-    def _ensure_tenant(self) -> None:
-        try:
-            async_to_sync(permit_client.api.tenants.create)(
-                {"key": permit_config.tenant_key, "name": permit_config.tenant_key}
-            )
-        except Exception:
-            return
+    The fingerprint of the applied state is stored in ``accounts.PermitBootstrap``, so repeat calls
+    make no remote requests until the desired state (or the Permit environment) changes.
+    """
 
-    def _ensure_resource_document(self) -> None:
-        try:
-            async_to_sync(permit_client.api.resources.create)(
-                {
-                    "key": "document",
-                    "name": "Document",
-                    "actions": {
-                        "create": {"name": "create"},
-                        "read": {"name": "read"},
-                        "update": {"name": "update"},
-                        "delete": {"name": "delete"},
-                    },
-                }
-            )
-        except Exception:
-            return
+    _applied: set[str] = set()
 
-    def _ensure_role_admin(self) -> None:
-        try:
-            async_to_sync(permit_client.api.roles.create)(
-                {"key": permit_config.admin_role_key, "name": "Admin"}
-            )
-        except Exception:
-            return
+    def bootstrap(self, force: bool = False) -> bool:
+        """Returns True if Permit was contacted, False if the stored fingerprint was current."""
+        current = fingerprint()
+        if not force and (current in self._applied or PermitBootstrap.objects.filter(fingerprint=current).exists()):
+            self._applied.add(current)
+            return False
 
-    def _ensure_role_user(self) -> None:
-        try:
-            async_to_sync(permit_client.api.roles.create)(
-                {"key": permit_config.user_role_key, "name": "User"}
-            )
-        except Exception:
-            return
+        if async_to_sync(self._apply)(desired_state()):
+            PermitBootstrap.objects.get_or_create(fingerprint=current)
+            self._applied.add(current)
+        return True
 
-    def _ensure_policy_admin_document_full_access(self) -> None:
-        try:
-            async_to_sync(permit_client.api.policies.create)(
-                {
-                    "role": permit_config.admin_role_key,
-                    "resource": "document",
-                    "actions": ["create", "read", "update", "delete"],
-                    "tenant": permit_config.tenant_key,
-                }
+    async def _apply(self, state: dict[str, Any]) -> bool:
+        # Permissions reference the resource and roles, so those go first (concurrently).
+        first = [
+            self._ensure("tenant", lambda: permit_client.api.tenants.create(state["tenant"])),
+            *[
+                self._ensure(f"resource {r['key']}", lambda r=r: permit_client.api.resources.create(r))
+                for r in state["resources"]
+            ],
+            *[
+                self._ensure(f"role {r['key']}", lambda r=r: permit_client.api.roles.create(r))
+                for r in state["roles"]
+            ],
+        ]
+        second = [
+            self._ensure(
+                f"permissions {role}",
+                lambda role=role, perms=perms: permit_client.api.roles.assign_permissions(
+                    role_key=role, permissions=perms
+                ),
             )
-        except Exception:
-            return
+            for role, perms in state["role_permissions"].items()
+        ]
+        ok_first = all(await asyncio.gather(*first))
+        ok_second = all(await asyncio.gather(*second))
+        return ok_first and ok_second
 
-    def _ensure_policy_user_document_access(self) -> None:
+    async def _ensure(self, label: str, create: Callable[[], Awaitable[Any]]) -> bool:
         try:
-            async_to_sync(permit_client.api.roles.assign_permissions)(
-                role_key=permit_config.user_role_key,
-                permissions=["document:create", "document:read"]
-            )
+            await create()
+        except PermitAlreadyExistsError:
+            pass
         except Exception as e:
-            print(f"Error assigning user permissions: {e}")
-            return
+            logger.warning("Permit bootstrap step %s failed: %s", label, e)
+            return False
+        return True
@@ -1,12 +1,57 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Sequence
 from django.conf import settings
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from integrations.cache import TTLCache
+
+search_cache = TTLCache(
+    maxsize=settings.TMDB_CACHE_SIZE,
+    ttl=settings.TMDB_SEARCH_CACHE_TTL,
+    stale_ttl=settings.TMDB_CACHE_STALE_TTL,
+)
+detail_cache = TTLCache(
+    maxsize=settings.TMDB_CACHE_SIZE,
+    ttl=settings.TMDB_DETAIL_CACHE_TTL,
+    stale_ttl=settings.TMDB_CACHE_STALE_TTL,
+)
+
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tmdb-refresh")
+# Separate from the refresh pool so fan-out calls never queue behind revalidation.
+_fanout_pool = ThreadPoolExecutor(max_workers=settings.TMDB_FANOUT_WORKERS, thread_name_prefix="tmdb-fanout")
+_refreshing: set[Hashable] = set()
+_refreshing_lock = threading.Lock()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def build_session(pool_size: int | None = None) -> requests.Session:
+    pool_size = pool_size or settings.TMDB_POOL_SIZE
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 @dataclass(frozen=True)
 class TmdbClient:
     session: requests.Session
+    search_cache: TTLCache | None = field(default=None)
+    detail_cache: TTLCache | None = field(default=None)
 
     def _auth(self) -> tuple[dict[str, str], dict[str, str]]:
         headers: dict[str, str] = {"accept": "application/json"}
@@ -17,7 +62,44 @@ class TmdbClient:
             params["api_key"] = settings.TMDB_API_KEY
         return headers, params
 
-    def search_movie(self, query: str, limit: int) -> list[dict]:
+    def _cached(self, cache: TTLCache | None, key: Hashable, fetch: Callable[[], tuple[Any, bool]]) -> Any:
+        """Serve from ``cache`` (refreshing stale entries in the background), else fetch and store.
+
+        ``fetch`` returns ``(payload, cacheable)`` so error responses are passed through uncached.
+        """
+        if cache is None:
+            return fetch()[0]
+        found = cache.peek(key)
+        if found is not None:
+            value, stale = found
+            if stale:
+                self._refresh(cache, key, fetch)
+            return value
+        value, cacheable = fetch()
+        if cacheable:
+            cache.set(key, value)
+        return value
+
+    def _refresh(self, cache: TTLCache, key: Hashable, fetch: Callable[[], tuple[Any, bool]]) -> None:
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def run() -> None:
+            try:
+                value, cacheable = fetch()
+                if cacheable:
+                    cache.set(key, value)
+            except Exception:
+                pass
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        _refresh_pool.submit(run)
+
+    def _fetch_search(self, query: str) -> tuple[list[dict], bool]:
         url = "https://api.themoviedb.org/3/search/movie"
         headers, params = self._auth()
         resp = self.session.get(
@@ -27,17 +109,47 @@ class TmdbClient:
             timeout=30,
         )
         data = resp.json()
-        results = data.get("results") or []
+        return data.get("results") or [], resp.ok
+
+    def _fetch_detail(self, movie_id: int, timeout: float = 30) -> tuple[dict, bool]:
+        url = f"https://api.themoviedb.org/3/movie/{movie_id}"
+        headers, params = self._auth()
+        resp = self.session.get(url, headers=headers, params=params, timeout=timeout)
+        return resp.json(), resp.ok
+
+    def search_movie(self, query: str, limit: int) -> list[dict]:
+        # The full first page is cached per query; every limit is served from it.
+        key = ("search", _normalize_query(query))
+        results = self._cached(self.search_cache, key, lambda: self._fetch_search(query))
         return results[:limit]
-   
+
     def search_movies(self, query: str, limit: int) -> list[dict]:
         return self.search_movie(query=query, limit=limit)
 
     def movie_detail(self, movie_id: int) -> dict:
-        url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-        headers, params = self._auth()
-        resp = self.session.get(url, headers=headers, params=params, timeout=30)
-        return resp.json()
+        movie_id = int(movie_id)
+        return self._cached(self.detail_cache, ("detail", movie_id), lambda: self._fetch_detail(movie_id))
+
+    def movie_details_many(self, movie_ids: Sequence[int], timeout: float | None = None) -> list[dict]:
+        """Fetch several movies concurrently, in input order; failures come back as ``{"id", "error"}``."""
+        timeout = settings.TMDB_DETAIL_TIMEOUT if timeout is None else timeout
+        ids = list(dict.fromkeys(int(i) for i in movie_ids))
+
+        def fetch(movie_id: int) -> dict:
+            return self._cached(
+                self.detail_cache,
+                ("detail", movie_id),
+                lambda: self._fetch_detail(movie_id, timeout=timeout),
+            )
+
+        futures = {movie_id: _fanout_pool.submit(fetch, movie_id) for movie_id in ids}
+        details: dict[int, dict] = {}
+        for movie_id, future in futures.items():
+            try:
+                details[movie_id] = future.result()
+            except Exception as e:
+                details[movie_id] = {"id": movie_id, "error": str(e)}
+        return [details[movie_id] for movie_id in ids]
 
 
-tmdb_client = TmdbClient(session=requests.Session())
+tmdb_client = TmdbClient(session=build_session(), search_cache=search_cache, detail_cache=detail_cache)
@@ -1,25 +1,89 @@
 from typing import Sequence
-from chat.models import ChatThread, ChatMessage
+from django.db import transaction
+from django.db.models import Q, QuerySet, Subquery
+from django.utils import timezone
+from chat.models import ChatThread, ChatMessage, GraphCheckpoint, GraphCheckpointWrite
 
 class ChatRepository:
     def list_threads(self, owner_id: int, limit: int = 20) -> Sequence[ChatThread]:
         return ChatThread.objects.filter(owner_id=owner_id).order_by("-updated_at")[:limit]
 
+    def all_threads(self, owner_id: int | None) -> QuerySet[ChatThread]:
+        qs = ChatThread.objects.all()
+        if owner_id is not None:
+            qs = qs.filter(owner_id=owner_id)
+        return qs.order_by("-updated_at", "-id")
+
     def get_thread(self, owner_id: int, thread_id: int) -> ChatThread:
         return ChatThread.objects.get(id=thread_id, owner_id=owner_id)
 
     def get_thread_by_uuid(self, owner_id: int, uuid: str) -> ChatThread | None:
         return ChatThread.objects.filter(uuid=uuid, owner_id=owner_id).first()
 
+    def thread_owned_by_other(self, owner_id: int, uuid: str) -> bool:
+        return ChatThread.objects.filter(uuid=uuid).exclude(owner_id=owner_id).exists()
+
     def get_messages(self, thread_id: int) -> Sequence[ChatMessage]:
         return ChatMessage.objects.filter(thread_id=thread_id).order_by("created_at")
 
+    def get_messages_page(
+        self, thread_id: int, limit: int, before_id: int | None = None
+    ) -> tuple[list[ChatMessage], int | None]:
+        """Up to ``limit`` messages older than ``before_id`` (or the newest ones), oldest first.
+
+        Also returns the id to pass as ``before_id`` for the next older page, or None at the start of the thread.
+        """
+        qs = ChatMessage.objects.filter(thread_id=thread_id)
+        if before_id is not None:
+            anchor = Subquery(ChatMessage.objects.filter(id=before_id, thread_id=thread_id).values("created_at")[:1])
+            qs = qs.filter(Q(created_at__lt=anchor) | Q(created_at=anchor, id__lt=before_id))
+        messages = list(qs.order_by("-created_at", "-id")[: limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        messages.reverse()
+        return messages, (messages[0].id if has_more else None)
+
     def create_thread(self, owner_id: int, title: str, uuid: str = None) -> ChatThread:
         return ChatThread.objects.create(owner_id=owner_id, title=title, uuid=uuid)
 
     def add_message(self, thread_id: int, role: str, content: str) -> ChatMessage:
         return ChatMessage.objects.create(thread_id=thread_id, role=role, content=content)
 
+    def record_turn(
+        self,
+        owner_id: int,
+        uuid: str,
+        title: str,
+        messages: Sequence[tuple[str, str]],
+        agent: str = "",
+        checkpoint_id: str | None = None,
+    ) -> int:
+        """Creates or touches the thread and appends ``(role, content)`` messages in one transaction.
+
+        Returns the thread id. ``title`` is only used when the thread is new; ``checkpoint_id`` is the graph
+        checkpoint the turn started from and is kept on its user message so the turn can be regenerated.
+        """
+        with transaction.atomic():
+            thread, created = ChatThread.objects.only("id").get_or_create(
+                uuid=uuid, owner_id=owner_id, defaults={"title": title}
+            )
+            if not created:
+                ChatThread.objects.filter(id=thread.id).update(updated_at=timezone.now())
+            # One INSERT; ids keep the turn's messages in order.
+            ChatMessage.objects.bulk_create(
+                [
+                    ChatMessage(
+                        thread_id=thread.id,
+                        role=role,
+                        content=content,
+                        agent=agent,
+                        checkpoint_id=checkpoint_id if role == "user" else None,
+                    )
+                    for role, content in messages
+                ]
+            )
+        return thread.id
+
     def update_thread_title(self, owner_id: int, thread_id: int, title: str) -> ChatThread:
         thread = ChatThread.objects.get(id=thread_id, owner_id=owner_id)
         thread.title = title
@@ -32,8 +96,25 @@ class ChatRepository:
         message.save()
         return message
 
-    def delete_messages_after(self, thread_id: int, created_after) -> None:
-        ChatMessage.objects.filter(thread_id=thread_id, created_at__gt=created_after).delete()
+    def get_checkpoint_id(self, message_id: int) -> str | None:
+        return ChatMessage.objects.filter(id=message_id).values_list("checkpoint_id", flat=True).first()
+
+    def get_messages_before(self, thread_id: int, created_before, before_id: int) -> list[tuple[str, str]]:
+        """``(role, content)`` of every message ahead of the given one, oldest first."""
+        qs = ChatMessage.objects.filter(
+            Q(created_at__lt=created_before) | Q(created_at=created_before, id__lt=before_id), thread_id=thread_id
+        )
+        return list(qs.order_by("created_at", "id").values_list("role", "content"))
+
+    def delete_messages_after(self, thread_id: int, created_after, after_id: int) -> None:
+        # The id breaks ties between messages with the same created_at.
+        ChatMessage.objects.filter(
+            Q(created_at__gt=created_after) | Q(created_at=created_after, id__gt=after_id), thread_id=thread_id
+        ).delete()
 
     def delete_thread(self, owner_id: int, thread_id: int) -> None:
+        uuid = ChatThread.objects.filter(id=thread_id, owner_id=owner_id).values_list("uuid", flat=True).first()
+        if uuid:
+            GraphCheckpointWrite.objects.filter(thread_id=uuid).delete()
+            GraphCheckpoint.objects.filter(thread_id=uuid).delete()
         ChatThread.objects.filter(id=thread_id, owner_id=owner_id).delete()
\ No newline at end of file
@@ -1,50 +1,148 @@
 from __future__ import annotations
+import logging
+import re
 from typing import Sequence
-from django.db.models import Q
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q, QuerySet
 from documents.models import Document
+from domain.documents.types import DocumentCursor
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every token so user input can't inject FTS5 syntax; the last one matches as a prefix.
+    tokens = [f'"{t}"' for t in _TOKEN_RE.findall(query)]
+    if tokens:
+        tokens[-1] += "*"
+    return " ".join(tokens)
+
+
+def _ranked_ids(owner_id: int | None, query: str, limit: int) -> list[int]:
+    """Best-matching live document ids, most relevant first, from the backend's full-text index."""
+    owner_sql = " AND d.owner_id = %s" if owner_id is not None else ""
+    owner_params = [owner_id] if owner_id is not None else []
+    if connection.vendor == "postgresql":
+        sql = (
+            "SELECT d.id FROM documents_document d, websearch_to_tsquery('english', %s) query"
+            " WHERE d.search_vector @@ query AND NOT d.is_deleted" + owner_sql +
+            " ORDER BY ts_rank_cd(d.search_vector, query) DESC, d.created_at DESC LIMIT %s"
+        )
+        params = [query, *owner_params, limit]
+    elif connection.vendor == "sqlite":
+        match = _fts5_query(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT d.id FROM documents_document_fts f JOIN documents_document d ON d.id = f.rowid"
+            " WHERE documents_document_fts MATCH %s AND d.is_deleted = 0" + owner_sql +
+            " ORDER BY bm25(documents_document_fts, 10.0, 1.0), d.created_at DESC LIMIT %s"
+        )
+        params = [match, *owner_params, limit]
+    else:
+        raise NotImplementedError(connection.vendor)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _live(summary: bool = False) -> QuerySet[Document]:
+    # Every caller serializes owner_username, so join the owner up front.
+    qs = Document.objects.select_related("owner").filter(is_deleted=False)
+    return qs.defer("content") if summary else qs
 
 
 class DocumentsRepository:
-    def list_recent(self, owner_id: int | None, limit: int) -> Sequence[Document]:
-        qs = Document.objects.filter(is_deleted=False)
+    def list_recent(
+        self,
+        owner_id: int | None,
+        limit: int,
+        after: DocumentCursor | None = None,
+        summary: bool = False,
+    ) -> Sequence[Document]:
+        qs = _live(summary)
         if owner_id is not None:
             qs = qs.filter(owner_id=owner_id)
-        return qs.order_by("-created_at")[:limit]
+        if after is not None:
+            qs = qs.filter(Q(created_at__lt=after.created_at) | Q(created_at=after.created_at, id__lt=after.id))
+        return qs.order_by("-created_at", "-id")[:limit]
 
-    def search(self, owner_id: int | None, query: str, limit: int) -> Sequence[Document]:
-        qs = Document.objects.filter(is_deleted=False)
+    def all_live(self, owner_id: int | None, summary: bool = False) -> QuerySet[Document]:
+        qs = _live(summary)
         if owner_id is not None:
             qs = qs.filter(owner_id=owner_id)
-            
+        return qs.order_by("-created_at", "-id")
+
+    def list_page(
+        self,
+        owner_id: int | None,
+        limit: int,
+        after: DocumentCursor | None = None,
+        summary: bool = False,
+    ) -> tuple[list[Document], DocumentCursor | None]:
+        docs = list(self.list_recent(owner_id=owner_id, limit=limit + 1, after=after, summary=summary))
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, DocumentCursor(created_at=docs[-1].created_at, id=docs[-1].id)
+
+    def search(self, owner_id: int | None, query: str, limit: int, summary: bool = False) -> Sequence[Document]:
         q = (query or "").strip()
-        if q:
-            qs = qs.filter(Q(title__icontains=q) | Q(content__icontains=q))
+        if not q:
+            return self.list_recent(owner_id=owner_id, limit=limit, summary=summary)
+        try:
+            ids = _ranked_ids(owner_id=owner_id, query=q, limit=limit)
+        except NotImplementedError:
+            return self._search_substring(owner_id=owner_id, query=q, limit=limit, summary=summary)
+        except DatabaseError:
+            logger.exception("Full-text document search failed; falling back to a substring scan")
+            return self._search_substring(owner_id=owner_id, query=q, limit=limit, summary=summary)
+        docs = _live(summary).in_bulk(ids)
+        return [docs[i] for i in ids if i in docs]
+
+    def _search_substring(self, owner_id: int | None, query: str, limit: int, summary: bool = False) -> Sequence[Document]:
+        qs = _live(summary)
+        if owner_id is not None:
+            qs = qs.filter(owner_id=owner_id)
+        qs = qs.filter(Q(title__icontains=query) | Q(content__icontains=query))
         return qs.order_by("-created_at")[:limit]
 
     def get(self, owner_id: int | None, document_id: int) -> Document:
-        qs = Document.objects.filter(id=document_id, is_deleted=False)
+        qs = _live().filter(id=document_id)
         if owner_id is not None:
             qs = qs.filter(owner_id=owner_id)
         return qs.get()
 
     def create(self, owner_id: int, title: str, content: str | None) -> Document:
-        return Document.objects.create(owner_id=owner_id, title=title, content=content)
+        doc = Document.objects.create(owner_id=owner_id, title=title, content=content)
+        # Read it back with the owner joined, like every other read, so serializing it costs no extra query.
+        return _live().get(id=doc.id)
+
+    def bulk_create(self, owner_id: int, rows: Sequence[tuple[str, str | None]]) -> list[int]:
+        """Inserts ``(title, content)`` rows in one transaction; returns the new ids in order."""
+        with transaction.atomic():
+            docs = Document.objects.bulk_create(
+                [Document(owner_id=owner_id, title=title, content=content) for title, content in rows]
+            )
+        return [d.id for d in docs]
 
     def soft_delete(self, owner_id: int | None, document_id: int) -> None:
-        qs = Document.objects.filter(id=document_id, is_deleted=False)
+        qs = _live().filter(id=document_id)
         if owner_id is not None:
             qs = qs.filter(owner_id=owner_id)
         obj = qs.get()
         obj.soft_delete()
 
     def request_delete(self, owner_id: int, document_id: int) -> Document:
-        obj = Document.objects.get(id=document_id, owner_id=owner_id, is_deleted=False)
+        obj = _live().get(id=document_id, owner_id=owner_id)
         obj.delete_requested = True
         obj.save(update_fields=["delete_requested", "updated_at"])
         return obj
 
     def undo_request_delete(self, document_id: int) -> Document:
-        obj = Document.objects.get(id=document_id, is_deleted=False)
+        obj = _live().get(id=document_id)
         obj.delete_requested = False
         obj.save(update_fields=["delete_requested", "updated_at"])
         return obj
\ No newline at end of file
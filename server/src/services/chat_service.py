@@ -1,26 +1,40 @@
 from dataclasses import dataclass
-from typing import Sequence
+from typing import AsyncIterator, Sequence
+from django.conf import settings
 from domain.auth.types import Identity
-from domain.chat.schemas import ChatThreadOut, ChatMessageOut
+from domain.chat.schemas import ChatThreadExportOut, ChatThreadOut, ChatMessageOut
 from repositories.chat_repo import ChatRepository
-from integrations.authorizer import Authorizer
+from integrations.authorizer import AsyncAuthorizer
 
 @dataclass(frozen=True)
 class ChatService:
     repo: ChatRepository
-    auth: Authorizer
+    auth: AsyncAuthorizer
 
     def list_threads(self, identity: Identity, owner_id: int) -> list[ChatThreadOut]:
         threads = self.repo.list_threads(owner_id=owner_id)
         return [ChatThreadOut.model_validate(t, from_attributes=True) for t in threads]
 
-    def get_thread_messages(self, identity: Identity, owner_id: int, thread_uuid: str) -> list[ChatMessageOut]:
+    async def export_threads(self, identity: Identity, owner_id: int | None) -> AsyncIterator[ChatThreadExportOut]:
+        """Threads of ``owner_id``, or of every owner when it is None (admins)."""
+        async for thread in self.repo.all_threads(owner_id=owner_id).aiterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            yield ChatThreadExportOut.model_validate(thread, from_attributes=True)
+
+    def get_thread_messages(
+        self,
+        identity: Identity,
+        owner_id: int,
+        thread_uuid: str,
+        before: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[ChatMessageOut], int | None]:
         thread = self.repo.get_thread_by_uuid(owner_id=owner_id, uuid=thread_uuid)
         if not thread:
-            return []
-            
-        messages = self.repo.get_messages(thread_id=thread.id)
-        return [ChatMessageOut.model_validate(m, from_attributes=True) for m in messages]
+            return [], None
+
+        limit = max(1, min(limit, 200))
+        messages, next_before = self.repo.get_messages_page(thread_id=thread.id, limit=limit, before_id=before)
+        return [ChatMessageOut.model_validate(m, from_attributes=True) for m in messages], next_before
 
     def delete_thread(self, identity: Identity, owner_id: int, thread_id: int) -> None:
         self.repo.delete_thread(owner_id=owner_id, thread_id=thread_id)
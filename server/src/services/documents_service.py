@@ -1,45 +1,218 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import IO, Any, AsyncIterator
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from pydantic import ValidationError
 from domain.auth.types import Identity
-from domain.documents.schemas import DocumentCreate, DocumentOut
+from domain.documents.types import DocumentCursor
+from domain.documents.schemas import (
+    DocumentCreate,
+    DocumentImportError,
+    DocumentImportOut,
+    DocumentOut,
+    DocumentPermissionsOut,
+    DocumentSummaryOut,
+    DocumentUpdate,
+)
 from repositories.documents_repo import DocumentsRepository
-from integrations.authorizer import Authorizer
+from integrations.authorizer import AsyncAuthorizer
+
+# Permit action each operation is checked against; /permissions reports exactly these decisions.
+# Updates are scoped to the caller's own documents (or any, for admins), so they need only "read".
+_OPERATION_ACTIONS = {"read": "read", "create": "create", "update": "read", "delete": "delete"}
+
+def _out(doc) -> DocumentOut:
+    return DocumentOut.model_validate(doc, from_attributes=True)
+
+def _summary(doc) -> DocumentSummaryOut:
+    return DocumentSummaryOut.model_validate(doc, from_attributes=True)
+
+class ImportTooLarge(ValueError):
+    """The import body is over DOCUMENT_IMPORT_MAX_BYTES."""
+
+def _too_large() -> ImportTooLarge:
+    return ImportTooLarge(
+        f"Import body is over {settings.DOCUMENT_IMPORT_MAX_BYTES} bytes; split it across several requests"
+    )
+
+def _too_many() -> ValueError:
+    return ValueError(f"At most {settings.DOCUMENT_IMPORT_MAX_ROWS} documents per request")
+
+def _parse_import(body: IO[bytes], ndjson: bool) -> list[Any]:
+    """Import rows from a JSON array or NDJSON stream; an unparseable NDJSON line becomes an exception in its slot.
+
+    NDJSON is parsed line by line as it is read and stops at the row limit; a JSON array is read whole.
+    """
+    max_bytes = settings.DOCUMENT_IMPORT_MAX_BYTES
+    if not ndjson:
+        raw = body.read(max_bytes + 1)
+        if len(raw) > max_bytes:
+            raise _too_large()
+        try:
+            rows = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of documents")
+        if len(rows) > settings.DOCUMENT_IMPORT_MAX_ROWS:
+            raise _too_many()
+        return rows
+    rows: list[Any] = []
+    read = 0
+    for line in iter(body.readline, b""):
+        read += len(line)
+        if read > max_bytes:
+            raise _too_large()
+        if not line.strip():
+            continue
+        if len(rows) == settings.DOCUMENT_IMPORT_MAX_ROWS:
+            raise _too_many()
+        try:
+            rows.append(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            rows.append(ValueError(f"Invalid JSON: {e}"))
+    return rows
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors())
+    return str(error)
 
 @dataclass(frozen=True)
 class DocumentsService:
     repo: DocumentsRepository
-    auth: Authorizer
+    auth: AsyncAuthorizer
 
-    def list_recent(self, identity: Identity, owner_id: int, limit: int) -> list[DocumentOut]:
-        if not self.auth.check(identity, "read", "document"):
+    async def _require(self, identity: Identity, action: str) -> None:
+        if not await self.auth.check(identity, action, "document"):
             raise PermissionError("Forbidden")
+
+    async def permissions(self, identity: Identity) -> DocumentPermissionsOut:
+        actions = sorted(set(_OPERATION_ACTIONS.values()))
+        decisions = dict(zip(actions, await self.auth.check_many(identity, [(a, "document") for a in actions])))
+        return DocumentPermissionsOut(**{op: decisions[action] for op, action in _OPERATION_ACTIONS.items()})
+
+    async def list_recent(
+        self,
+        identity: Identity,
+        owner_id: int | None,
+        limit: int,
+        cursor: str | None = None,
+        summary: bool = False,
+    ) -> tuple[list[DocumentOut] | list[DocumentSummaryOut], str | None]:
+        """One page of live documents, newest first, plus the cursor for the next page (None on the last).
+
+        ``summary`` leaves ``content`` unloaded and returns DocumentSummaryOut rows.
+        """
+        await self._require(identity, "read")
+        limit = min(max(limit, 1), 100)
+        after = DocumentCursor.decode(cursor) if cursor else None
+        serialize = _summary if summary else _out
+
+        def _load() -> tuple[list, str | None]:
+            docs, next_cursor = self.repo.list_page(owner_id=owner_id, limit=limit, after=after, summary=summary)
+            return [serialize(d) for d in docs], next_cursor.encode() if next_cursor else None
+
+        return await sync_to_async(_load)()
+
+    async def export(
+        self, identity: Identity, owner_id: int | None, summary: bool = False
+    ) -> AsyncIterator[DocumentOut] | AsyncIterator[DocumentSummaryOut]:
+        """Every live document, newest first, read from the database in chunks as the caller consumes them."""
+        await self._require(identity, "read")
+        serialize = _summary if summary else _out
+        qs = self.repo.all_live(owner_id=owner_id, summary=summary)
+
+        async def _rows():
+            async for doc in qs.aiterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+                yield serialize(doc)
+
+        return _rows()
+
+    async def search(
+        self,
+        identity: Identity,
+        owner_id: int | None,
+        query: str,
+        limit: int,
+        summary: bool = False,
+    ) -> list[DocumentOut] | list[DocumentSummaryOut]:
+        await self._require(identity, "read")
         limit = min(max(limit, 1), 25)
-        docs = self.repo.list_recent(owner_id=owner_id, limit=limit)
-        return [DocumentOut.model_validate(d, from_attributes=True) for d in docs]
+        serialize = _summary if summary else _out
 
-    def create(self, identity: Identity, owner_id: int, payload: DocumentCreate) -> DocumentOut:
-        if not self.auth.check(identity, "create", "document"):
-            raise PermissionError("Forbidden")
-        doc = self.repo.create(owner_id=owner_id, title=payload.title, content=payload.content)
-        return DocumentOut.model_validate(doc, from_attributes=True)
+        def _load() -> list:
+            return [serialize(d) for d in self.repo.search(owner_id=owner_id, query=query, limit=limit, summary=summary)]
 
-    def get(self, identity: Identity, owner_id: int, document_id: int) -> DocumentOut:
-        if not self.auth.check(identity, "read", "document"):
-            raise PermissionError("Forbidden")
-        doc = self.repo.get(owner_id=owner_id, document_id=document_id)
-        return DocumentOut.model_validate(doc, from_attributes=True)
+        return await sync_to_async(_load)()
 
-    def delete(self, identity: Identity, owner_id: int, document_id: int) -> None:
-        if not self.auth.check(identity, "delete", "document"):
-            raise PermissionError("Forbidden")
-        self.repo.soft_delete(owner_id=owner_id, document_id=document_id)
+    async def create(self, identity: Identity, owner_id: int, payload: DocumentCreate) -> DocumentOut:
+        await self._require(identity, "create")
+        return await sync_to_async(
+            lambda: _out(self.repo.create(owner_id=owner_id, title=payload.title, content=payload.content))
+        )()
 
-    def request_delete(self, identity: Identity, owner_id: int, document_id: int) -> DocumentOut:
-        if not self.auth.check(identity, "read", "document"):
-            raise PermissionError("Forbidden")
-        doc = self.repo.request_delete(owner_id=owner_id, document_id=document_id)
-        return DocumentOut.model_validate(doc, from_attributes=True)
+    async def bulk_create(self, identity: Identity, owner_id: int, body: IO[bytes], ndjson: bool = False) -> DocumentImportOut:
+        """Creates every valid row under one authorization decision, DOCUMENT_IMPORT_CHUNK_SIZE rows per transaction.
+
+        Invalid rows, and every row of a chunk the database rejects, are reported by index; the rest are kept.
+        """
+        await self._require(identity, "create")
+
+        # Reading the body blocks on the client, so parsing runs in the worker thread with the inserts.
+        def _import() -> DocumentImportOut:
+            errors: list[DocumentImportError] = []
+            valid: list[tuple[int, DocumentCreate]] = []
+            for index, row in enumerate(_parse_import(body, ndjson)):
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    valid.append((index, DocumentCreate.model_validate(row)))
+                except (ValueError, ValidationError) as e:
+                    errors.append(DocumentImportError(index=index, error=_describe(e)))
+
+            ids: list[int] = []
+            size = settings.DOCUMENT_IMPORT_CHUNK_SIZE
+            for start in range(0, len(valid), size):
+                chunk = valid[start : start + size]
+                try:
+                    ids.extend(self.repo.bulk_create(owner_id, [(p.title, p.content) for _, p in chunk]))
+                except Exception as e:
+                    errors.extend(DocumentImportError(index=index, error=str(e)) for index, _ in chunk)
+            errors.sort(key=lambda e: e.index)
+            return DocumentImportOut(created=len(ids), ids=ids, errors=errors)
+
+        return await sync_to_async(_import)()
+
+    async def get(self, identity: Identity, owner_id: int | None, document_id: int) -> DocumentOut:
+        await self._require(identity, "read")
+        return await sync_to_async(lambda: _out(self.repo.get(owner_id=owner_id, document_id=document_id)))()
+
+    async def update(self, identity: Identity, owner_id: int | None, document_id: int, payload: DocumentUpdate) -> DocumentOut:
+        await self._require(identity, _OPERATION_ACTIONS["update"])
+
+        def _update() -> DocumentOut:
+            doc = self.repo.get(owner_id=owner_id, document_id=document_id)
+            if payload.title is not None:
+                doc.title = payload.title
+            if payload.content is not None:
+                doc.content = payload.content
+            doc.save()
+            return _out(doc)
+
+        return await sync_to_async(_update)()
+
+    async def delete(self, identity: Identity, owner_id: int | None, document_id: int) -> None:
+        await self._require(identity, "delete")
+        await sync_to_async(self.repo.soft_delete)(owner_id=owner_id, document_id=document_id)
+
+    async def request_delete(self, identity: Identity, owner_id: int, document_id: int) -> DocumentOut:
+        await self._require(identity, "read")
+        return await sync_to_async(
+            lambda: _out(self.repo.request_delete(owner_id=owner_id, document_id=document_id))
+        )()
 
-    def undo_request_delete(self, identity: Identity, document_id: int) -> DocumentOut:
-        doc = self.repo.undo_request_delete(document_id=document_id)
-        return DocumentOut.model_validate(doc, from_attributes=True)
\ No newline at end of file
+    async def undo_request_delete(self, identity: Identity, document_id: int) -> DocumentOut:
+        return await sync_to_async(lambda: _out(self.repo.undo_request_delete(document_id=document_id)))()
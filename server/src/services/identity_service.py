@@ -0,0 +1,70 @@
+from __future__ import annotations
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from accounts.models import PermitOutbox, PermitSync
+from domain.auth.types import Identity
+from services import permit_outbox
+
+User = get_user_model()
+
+
+def tenant_key_for(tenant: str | None) -> str:
+    return (tenant or settings.PERMIT_TENANT_KEY or "default").strip() or "default"
+
+
+def _cache_key(user_id: int) -> str:
+    return f"identity:{user_id}"
+
+
+def _signature(role: str, tenant_key: str) -> str:
+    return f"{role}:{tenant_key}"
+
+
+async def resolve_identity(user_id: int, tenant: str | None, role: str = "user", username: str = "user") -> Identity:
+    """Make sure the caller exists locally and in Permit with ``role``; cached so the steady state costs no queries."""
+    tenant_key = tenant_key_for(tenant)
+    identity = Identity(user_key=str(user_id), tenant_key=tenant_key)
+    signature = _signature(role, tenant_key)
+    if await cache.aget(_cache_key(user_id)) == signature:
+        return identity
+
+    user, _ = await User.objects.aget_or_create(
+        id=user_id,
+        defaults={
+            "username": username,
+            "email": f"{username}@local.dev",
+            "first_name": username,
+        },
+    )
+    synced = await PermitSync.objects.filter(user_id=user_id).afirst()
+    if synced is not None and synced.role == role:
+        await cache.aset(_cache_key(user_id), signature, settings.IDENTITY_CACHE_TTL)
+        return identity
+
+    entries = await sync_to_async(request_permit_sync)(user_id, role, username=user.username)
+    if settings.AUTHZ_BACKEND == "local":
+        # Local decisions already read queued roles, so the identity is settled once its entries are queued.
+        await cache.aset(_cache_key(user_id), signature, settings.IDENTITY_CACHE_TTL)
+        permit_outbox.kick(entries)
+    elif synced is None:
+        # First contact: this request's own checks depend on the role, so drain its entries inline once.
+        result = await sync_to_async(permit_outbox.drain)(ids=[e.id for e in entries])
+        if result.done == len(entries):
+            await cache.aset(_cache_key(user_id), signature, settings.IDENTITY_CACHE_TTL)
+    else:
+        permit_outbox.kick(entries)
+    return identity
+
+
+def request_permit_sync(user_id: int, role: str, username: str) -> list[PermitOutbox]:
+    user_key = str(user_id)
+    return [
+        permit_outbox.enqueue_sync_user(user_key, email=f"{username}@local.dev", first_name=username),
+        permit_outbox.enqueue_assign_role(user_key, role),
+    ]
+
+
+def forget_identity(user_id: int) -> None:
+    cache.delete(_cache_key(user_id))
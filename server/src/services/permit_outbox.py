@@ -0,0 +1,233 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Sequence
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from accounts.models import PermitOutbox, PermitSync
+from integrations.authorizer import AsyncAuthorizer
+from integrations.permit_client import permit_config
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+_auth = AsyncAuthorizer()
+_kick_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="permit-outbox")
+
+# Claimed rows are hidden from other drainers for this long; a crashed drainer's rows reappear after it.
+_LEASE = timedelta(minutes=2)
+
+
+@dataclass(frozen=True)
+class DrainResult:
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.retried + self.failed
+
+
+def _idempotency_key(op: str, user_key: str, payload: dict) -> str:
+    raw = json.dumps([op, user_key, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _enqueue(op: str, user_key: str, payload: dict, supersedes: Sequence[str] = ()) -> PermitOutbox:
+    key = _idempotency_key(op, user_key, payload)
+    with transaction.atomic():
+        if supersedes:
+            (
+                PermitOutbox.objects.filter(status=PermitOutbox.PENDING, user_key=user_key, op__in=supersedes)
+                .exclude(idempotency_key=key)
+                .update(status=PermitOutbox.SUPERSEDED, processed_at=timezone.now())
+            )
+        entry, _ = PermitOutbox.objects.get_or_create(
+            idempotency_key=key,
+            status=PermitOutbox.PENDING,
+            defaults={"op": op, "user_key": user_key, "payload": payload},
+        )
+    return entry
+
+
+def enqueue_sync_user(user_key: str, email: str, first_name: str) -> PermitOutbox:
+    return _enqueue(PermitOutbox.SYNC_USER, user_key, {"email": email, "first_name": first_name})
+
+
+def enqueue_assign_role(user_key: str, role: str) -> PermitOutbox:
+    """Queue ``role`` ("admin" or "user") for the user in the configured tenant; an older pending role change is superseded."""
+    admin = role == "admin"
+    payload = {
+        "role": permit_config.admin_role_key if admin else permit_config.user_role_key,
+        "previous": permit_config.user_role_key if admin else permit_config.admin_role_key,
+        "local_role": role,
+    }
+    entry = _enqueue(PermitOutbox.ASSIGN_ROLE, user_key, payload, supersedes=[PermitOutbox.ASSIGN_ROLE])
+    # Decisions cached for the old role must not outlive the change by more than one drain.
+    _invalidate_on_commit(user_key)
+    return entry
+
+
+def enqueue_delete_user(user_key: str) -> PermitOutbox:
+    entry = _enqueue(
+        PermitOutbox.DELETE_USER,
+        user_key,
+        {},
+        supersedes=[PermitOutbox.SYNC_USER, PermitOutbox.ASSIGN_ROLE],
+    )
+    _invalidate_on_commit(user_key)
+    return entry
+
+
+def _invalidate_on_commit(user_key: str) -> None:
+    # Before the commit, a concurrent check would reload the old role and cache it until the next refresh.
+    transaction.on_commit(lambda: _auth.invalidate_user(user_key))
+
+
+def kick(entries: Sequence[PermitOutbox]) -> None:
+    """Drain ``entries`` soon on a background thread; the drain command picks up anything this misses."""
+    if not settings.PERMIT_OUTBOX_KICK or not entries:
+        return
+    ids = [e.id for e in entries]
+
+    def run() -> None:
+        try:
+            drain(ids=ids)
+        except Exception:
+            logger.exception("In-process Permit outbox drain failed")
+        finally:
+            close_old_connections()
+
+    _kick_pool.submit(run)
+
+
+def _claim(batch_size: int, ids: Sequence[int] | None) -> list[PermitOutbox]:
+    now = timezone.now()
+    with transaction.atomic():
+        # A role change waits while an older one for the same user is still in flight; otherwise the
+        # older call could reach Permit last and leave the stale role in place.
+        in_flight = PermitOutbox.objects.filter(op=PermitOutbox.ASSIGN_ROLE, claimed_at__gt=now - _LEASE).values("user_key")
+        qs = (
+            PermitOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=PermitOutbox.PENDING, next_attempt_at__lte=now)
+            .exclude(op=PermitOutbox.ASSIGN_ROLE, user_key__in=in_flight)
+        )
+        if ids is not None:
+            qs = qs.filter(id__in=ids)
+        batch = list(qs.order_by("next_attempt_at", "id")[:batch_size])
+        if batch:
+            PermitOutbox.objects.filter(id__in=[e.id for e in batch]).update(next_attempt_at=now + _LEASE, claimed_at=now)
+    return batch
+
+
+async def _run_phase(
+    entries: list[PermitOutbox],
+    bulk: Callable[[list[PermitOutbox]], Awaitable[None]],
+    single: Callable[[PermitOutbox], Awaitable[None]],
+    errors: dict[int, str],
+) -> None:
+    if not entries:
+        return
+    try:
+        await bulk(entries)
+        return
+    except Exception:
+        pass
+    # One bad row shouldn't fail the rest: retry the batch one operation at a time.
+    for entry in entries:
+        try:
+            await single(entry)
+        except Exception as e:
+            errors[entry.id] = str(e) or e.__class__.__name__
+
+
+async def _apply(batch: list[PermitOutbox]) -> dict[int, str]:
+    errors: dict[int, str] = {}
+    by_op: dict[str, list[PermitOutbox]] = {}
+    for entry in batch:
+        by_op.setdefault(entry.op, []).append(entry)
+
+    # Users must exist before roles are assigned; deletes go last.
+    await _run_phase(
+        by_op.get(PermitOutbox.SYNC_USER, []),
+        lambda es: _auth.sync_users([{"key": e.user_key, **e.payload} for e in es]),
+        lambda e: _auth.sync_user(user_key=e.user_key, **e.payload),
+        errors,
+    )
+    await _run_phase(
+        by_op.get(PermitOutbox.ASSIGN_ROLE, []),
+        lambda es: _auth.assign_roles([(e.user_key, e.payload["role"], e.payload["previous"]) for e in es]),
+        lambda e: _auth.assign_role(e.user_key, e.payload["role"], previous=e.payload["previous"]),
+        errors,
+    )
+    await _run_phase(
+        by_op.get(PermitOutbox.DELETE_USER, []),
+        lambda es: _auth.delete_users([e.user_key for e in es]),
+        lambda e: _auth.delete_user(e.user_key),
+        errors,
+    )
+    return errors
+
+
+def _backoff(attempts: int) -> timedelta:
+    seconds = settings.PERMIT_OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, 3600))
+
+
+def _record_roles(entries: list[PermitOutbox]) -> None:
+    for entry in entries:
+        if entry.op != PermitOutbox.ASSIGN_ROLE or not entry.user_key.isdigit():
+            continue
+        user_id = int(entry.user_key)
+        if not User.objects.filter(id=user_id).exists():
+            continue
+        PermitSync.objects.update_or_create(
+            user_id=user_id,
+            defaults={"role": entry.payload["local_role"]},
+        )
+
+
+def drain(batch_size: int | None = None, max_attempts: int | None = None, ids: Sequence[int] | None = None) -> DrainResult:
+    """Apply one batch of due outbox entries to Permit; returns what happened to them."""
+    batch_size = batch_size or settings.PERMIT_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.PERMIT_OUTBOX_MAX_ATTEMPTS
+    batch = _claim(batch_size, ids)
+    if not batch:
+        return DrainResult()
+
+    errors = async_to_sync(_apply)(batch)
+    now = timezone.now()
+    retried = failed = 0
+    with transaction.atomic():
+        # Rows superseded while Permit was being called stay superseded, and their roles aren't recorded.
+        applied = set(
+            PermitOutbox.objects.select_for_update()
+            .filter(id__in=[e.id for e in batch if e.id not in errors], status=PermitOutbox.PENDING)
+            .values_list("id", flat=True)
+        )
+        PermitOutbox.objects.filter(id__in=applied).update(status=PermitOutbox.DONE, processed_at=now, last_error="")
+        PermitOutbox.objects.filter(id__in=[e.id for e in batch]).update(claimed_at=None)
+        done = [e for e in batch if e.id in applied]
+        _record_roles(done)
+    for entry in batch:
+        if entry.id not in errors:
+            continue
+        attempts = entry.attempts + 1
+        if attempts >= max_attempts:
+            failed += 1
+            update = {"status": PermitOutbox.FAILED, "processed_at": now}
+        else:
+            retried += 1
+            update = {"next_attempt_at": now + _backoff(attempts)}
+        PermitOutbox.objects.filter(id=entry.id, status=PermitOutbox.PENDING).update(
+            attempts=attempts, last_error=errors[entry.id], **update
+        )
+    return DrainResult(done=len(done), retried=retried, failed=failed)
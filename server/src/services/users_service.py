@@ -1,12 +1,15 @@
+from typing import AsyncIterator
+from django.conf import settings
 from django.contrib.auth.models import User
-from asgiref.sync import async_to_sync
-from integrations.authorizer import Authorizer
 from domain.users.schemas import UserCreate, UserSchema
-from integrations.permit_client import permit_client, permit_config
+from integrations.authorizer import AsyncAuthorizer, Authorizer
+from integrations.permit_client import permit_config
+from services import permit_outbox
+from services.identity_service import forget_identity
 
 def create_user(data: UserCreate):
     """
-    Creates a new user in Django, syncs them to Permit.io, and assigns a role.
+    Creates a new user in Django and queues their Permit.io sync and role assignment.
     """
     # Create the user in Django
     user = User.objects.create_user(
@@ -19,55 +22,34 @@ def create_user(data: UserCreate):
         user.is_superuser = True
         user.save()
 
-    # Sync the user to Permit.io and assign the role
-    authorizer = Authorizer()
-    authorizer.sync_user(user_key=str(user.id), email=f"{data.username}@example.com", first_name=data.username)
-
-    if data.role == "admin":
-        authorizer.assign_admin(user_key=str(user.id))
-    else:
-        authorizer.assign_user(user_key=str(user.id))
+    # Sync the user to Permit.io and assign the role off the request path
+    permit_outbox.kick([
+        permit_outbox.enqueue_sync_user(str(user.id), email=f"{data.username}@example.com", first_name=data.username),
+        permit_outbox.enqueue_assign_role(str(user.id), data.role),
+    ])
     
     return user
 
 def delete_user(user_id: int):
     """
-    Deletes a user from Django and Permit.io.
+    Deletes a user from Django and queues their deletion from Permit.io.
     """
     try:
         user = User.objects.get(id=user_id)
-        
-        # Delete from Permit.io
-        async def _delete_permit_user():
-            await permit_client.api.users.delete(str(user.id))
-            
-        try:
-            async_to_sync(_delete_permit_user)()
-        except Exception:
-            # If deleting from Permit fails, we continue to delete from Django
-            pass
-            
+        permit_outbox.kick([permit_outbox.enqueue_delete_user(str(user.id))])
         user.delete()
+        forget_identity(user_id)
     except User.DoesNotExist:
         pass
 
 def update_user_role(user_id: int, role: str):
     """
-    Updates a user's role in Permit.io and local Django flags.
+    Updates local Django flags and queues the role change for Permit.io.
     """
     user = User.objects.get(id=user_id)
-    authorizer = Authorizer()
-
-    if role == "admin":
-        user.is_staff = True
-        user.is_superuser = True
-        authorizer.assign_admin(user_key=str(user.id))
-    else:
-        user.is_staff = False
-        user.is_superuser = False
-        authorizer.assign_user(user_key=str(user.id))
-    
+    user.is_staff = user.is_superuser = role == "admin"
     user.save()
+    permit_outbox.kick([permit_outbox.enqueue_assign_role(str(user.id), role)])
 
 def reset_password(user_id: int, new_password: str):
     """
@@ -77,36 +59,52 @@ def reset_password(user_id: int, new_password: str):
     user.set_password(new_password)
     user.save()
 
-def get_all_users_with_roles() -> list[UserSchema]:
+def _local_role(user: User) -> str:
+    return "admin" if user.is_superuser or user.is_staff else "user"
+
+def get_all_users_with_roles(offset: int = 0, limit: int = 100) -> tuple[list[UserSchema], int]:
     """
-    Retrieves all users from Django and their roles from Permit.io.
+    Retrieves one page of users and their roles from Permit.io, plus the total user count.
+    Roles come from a single bulk lookup per page (cached briefly); local DB flags are the fallback.
     """
-    users = User.objects.all()
-    users_with_roles = []
+    total = User.objects.count()
+    users = list(User.objects.order_by("id")[offset:offset + limit])
+
+    try:
+        assigned = Authorizer().roles_for([str(u.id) for u in users])
+    except Exception:
+        # Permit unreachable: fall back to local DB flags for the whole page
+        assigned = {}
+
+    return [_with_role(user, assigned) for user in users], total
 
-    for user in users:
-        user_schema = UserSchema(id=user.id, username=user.username, tenant=permit_config.tenant_key)
-        
-        async def _get_roles():
-            return await permit_client.api.users.get_assigned_roles(user_key=str(user.id))
+def _with_role(user: User, assigned: dict[str, list[str]]) -> UserSchema:
+    admin_role = permit_config.admin_role_key
+    roles = assigned.get(str(user.id)) or []
+    role = (admin_role if admin_role in roles else roles[0]) if roles else _local_role(user)
+    return UserSchema(id=user.id, username=user.username, role=role, tenant=permit_config.tenant_key)
 
+async def iter_users_with_roles() -> AsyncIterator[UserSchema]:
+    """
+    Yields every user with their role, reading users and Permit roles one chunk at a time.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    auth = AsyncAuthorizer()
+    batch: list[User] = []
+
+    async def _resolve(users: list[User]) -> list[UserSchema]:
         try:
-            assigned_roles = async_to_sync(_get_roles)()
-            if assigned_roles:
-                user_schema.role = assigned_roles[0].role
-            else:
-                # Fallback to local DB flags if Permit returns nothing
-                if user.is_superuser or user.is_staff:
-                    user_schema.role = "admin"
-                else:
-                    user_schema.role = "user"
+            assigned = await auth.roles_for([str(u.id) for u in users])
         except Exception:
-            # Handle cases where the user might not be in Permit.io yet, fallback to local DB flags
-            if user.is_superuser or user.is_staff:
-                user_schema.role = "admin"
-            else:
-                user_schema.role = "user"
-
-        users_with_roles.append(user_schema)
+            assigned = {}
+        return [_with_role(user, assigned) for user in users]
 
-    return users_with_roles
+    async for user in User.objects.order_by("id").aiterator(chunk_size=chunk_size):
+        batch.append(user)
+        if len(batch) >= chunk_size:
+            for row in await _resolve(batch):
+                yield row
+            batch = []
+    if batch:
+        for row in await _resolve(batch):
+            yield row